@@ -71,6 +71,7 @@ class ClaudeCodePoller:
         """Initialize the poller with configuration."""
         self.config_file = config_file
         self.verbose = verbose
+        self.average_execution_seconds = {}  # Running average per task type, used for ETAs
         self.load_config()
         self.setup_s3_client()
         self.setup_workspace()
@@ -189,6 +190,42 @@ Created by claude_code_poller.py
         """Validate task type against allowlist."""
         return task_type in APPROVED_TASK_TYPES
 
+    def upload_status(self, request_id: str, task_type: str):
+        """Upload a status object so the tool can sleep until the expected completion time."""
+        # No ETA until a request of this task type has completed, so the tool
+        # keeps polling quickly instead of sleeping on a guess
+        eta_seconds = self.average_execution_seconds.get(task_type)
+        status_data = {
+            "request_id": request_id,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "eta_seconds": round(eta_seconds, 2) if eta_seconds is not None else None
+        }
+        try:
+            self.s3_client.put_object(
+                Bucket=self.bucket_name,
+                Key=f"claude-code-status/{request_id}.json",
+                Body=json.dumps(status_data, separators=(',', ':')),
+                ContentType='application/json'
+            )
+        except ClientError as e:
+            # The status object is only a polling hint, never fail the request over it
+            self.log(f"Could not upload status for {request_id}: {str(e)}", level="WARNING")
+
+    def delete_status(self, request_id: str):
+        """Remove the status object once the response is available."""
+        try:
+            self.s3_client.delete_object(Bucket=self.bucket_name, Key=f"claude-code-status/{request_id}.json")
+        except ClientError as e:
+            self.log(f"Could not delete status for {request_id}: {str(e)}", level="WARNING")
+
+    def record_execution_time(self, task_type: str, execution_time: float):
+        """Fold a completed execution time into the running average for its task type."""
+        average = self.average_execution_seconds.get(task_type)
+        if average is None:
+            self.average_execution_seconds[task_type] = execution_time
+        else:
+            self.average_execution_seconds[task_type] = 0.7 * average + 0.3 * execution_time
+
     def _run_claude_command(self, cmd: list, request_id: str, start_time: float) -> tuple:
         """
         Execute a Claude Code command and return (success, result, execution_time, response_text).
@@ -379,25 +416,33 @@ Created by claude_code_poller.py
                 self.s3_client.put_object(
                     Bucket=self.bucket_name,
                     Key=response_key,
-                    Body=json.dumps(error_response, indent=2),
+                    Body=json.dumps(error_response, separators=(',', ':')),
                     ContentType='application/json'
                 )
                 # Delete request
                 self.s3_client.delete_object(Bucket=self.bucket_name, Key=request_key)
                 return
 
+            # Let the tool know the request was picked up and when to expect it
+            self.upload_status(request_id, task_type)
+
             # Execute Claude Code
             response_data = self.execute_claude_code(request_data)
+            if not response_data.get("error"):
+                self.record_execution_time(task_type, response_data["execution_time_seconds"])
 
             # Upload response
             response_key = f"claude-code-responses/{request_id}.json"
             self.s3_client.put_object(
                 Bucket=self.bucket_name,
                 Key=response_key,
-                Body=json.dumps(response_data, indent=2),
+                Body=json.dumps(response_data, separators=(',', ':')),
                 ContentType='application/json'
             )
 
+            # The response supersedes the status object
+            self.delete_status(request_id)
+
             # Delete processed request
             self.s3_client.delete_object(Bucket=self.bucket_name, Key=request_key)
 
@@ -914,7 +914,7 @@ def send_feed_engagement_message(client: Letta, agent_id: str) -> None:
 
         engagement_prompt = """This is your daily prompt to read your Bluesky feeds.
 
-Please use the get_bluesky_feed tool to read recent posts from both the 'home' and 'MLBlend' feeds. Look for:
+Please use the get_bluesky_feed tool to read recent posts from both the 'home' and 'MLBlend' feeds (pass feed_names=['home', 'MLBlend'] to fetch both in one call). Look for:
 - Interesting discussions or topics trending in your network
 - Posts that spark curiosity or that you could contribute to meaningfully
 - Themes or patterns in what people are discussing
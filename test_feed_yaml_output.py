@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Test that get_bluesky_feed's hand-written YAML parses back to the feed data."""
+
+import sys
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import yaml
+
+from tools.feed import get_bluesky_feed
+
+# Strings a plain YAML scalar would misread or fail to parse
+HOSTILE_STRINGS = [
+    "key: value",
+    "ends with colon:",
+    "- looks like a list item",
+    "-",
+    "? complex key",
+    "# looks like a comment",
+    "text # trailing comment",
+    "'single quoted'",
+    '"double quoted"',
+    "it's got an apostrophe",
+    'mixed \'single\' and "double"',
+    "line one\nline two",
+    "trailing newline\n",
+    "\n",
+    "tab\tinside",
+    "carriage\rreturn",
+    "yes", "no", "Yes", "NO", "on", "off", "true", "False",
+    "null", "Null", "~", "",
+    "0", "123", "-17", "1.5", "1e3", ".inf", "-.inf", ".nan", "0x1F", "0o17", "1_000", "12:30:45",
+    "2025-01-01", "2025-01-01T00:00:00Z",
+    " leading space", "trailing space ", "  ",
+    "[flow, sequence]", "{flow: mapping}", "& anchor", "* alias", "!tag", "| literal", "> folded",
+    "% directive", "@reserved", "`backtick", "---", "...",
+    "café", "日本語のテキスト", "emoji \U0001f98b✨", "مرحبا",
+    "zero\u200bwidth", "nbsp\u00a0inside", "line\u2028separator", "paragraph\u2029separator",
+    "bell\x07char", "del\x7fchar", "bom\ufeffinside", "c1\x85control",
+    "backslash \\ and \\n literal",
+]
+
+
+class FakeResponse:
+    def __init__(self, data, status_code=200):
+        self.status_code = status_code
+        self.content = json.dumps(data).encode("utf-8")
+        self.text = self.content.decode("utf-8")
+        self._data = data
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+            raise requests.exceptions.HTTPError(f"HTTP {self.status_code}", response=self)
+
+
+def build_timeline():
+    """One timeline item per hostile string, with the string in every text field."""
+    items = []
+    for i, value in enumerate(HOSTILE_STRINGS):
+        items.append({
+            "post": {
+                "uri": value,
+                "cid": value,
+                "author": {"handle": value, "displayName": value},
+                "record": {
+                    "text": value,
+                    "createdAt": value,
+                    "reply": {"parent": {"uri": value, "cid": value}},
+                },
+                "likeCount": i,
+                "repostCount": -i,
+                "replyCount": 10 ** (i % 21),
+            },
+            "reason": {
+                "$type": "app.bsky.feed.defs#reasonRepost",
+                "by": {"handle": value, "displayName": value},
+            },
+        })
+    return {"feed": items}
+
+
+def expected_posts():
+    return [
+        {
+            "author": {"handle": value, "display_name": value},
+            "text": value,
+            "created_at": value,
+            "uri": value,
+            "cid": value,
+            "like_count": i,
+            "repost_count": -i,
+            "reply_count": 10 ** (i % 21),
+            "reposted_by": {"handle": value, "display_name": value},
+            "reply_to": {"uri": value, "cid": value},
+        }
+        for i, value in enumerate(HOSTILE_STRINGS)
+    ]
+
+
+def fake_request(session, method, url, **kwargs):
+    nsid = url.rsplit("/", 1)[1]
+    if nsid == "com.atproto.server.createSession":
+        return FakeResponse({"accessJwt": "a.e30.s", "refreshJwt": "r", "did": "did:plc:testuser", "handle": "me.test"})
+    if nsid == "app.bsky.feed.getTimeline":
+        return FakeResponse(build_timeline())
+    return FakeResponse({"error": "MethodNotImplemented"}, 501)
+
+
+def run_feed(**kwargs):
+    with tempfile.TemporaryDirectory() as tmpdir, \
+            mock.patch.dict("os.environ", {"BSKY_USERNAME": "me.test", "BSKY_PASSWORD": "pw", "PDS_URI": "https://pds.test"}), \
+            mock.patch("tempfile.gettempdir", return_value=tmpdir), \
+            mock.patch("requests.Session.request", fake_request):
+        return get_bluesky_feed(**kwargs)
+
+
+def test_single_feed_yaml_round_trips():
+    """Every hostile string survives yaml.safe_load unchanged."""
+    output = run_feed(max_posts=100)
+    parsed = yaml.safe_load(output)
+
+    assert parsed["feed"]["type"] == "home"
+    assert parsed["feed"]["post_count"] == len(HOSTILE_STRINGS)
+    for expected, actual in zip(expected_posts(), parsed["feed"]["posts"]):
+        assert actual == expected, f"round trip changed {expected['text']!r}"
+    assert parsed["feed"]["posts"] == expected_posts()
+    print(f"✓ {len(HOSTILE_STRINGS)} hostile strings round-tripped")
+
+
+def test_multi_feed_yaml_round_trips():
+    """The 'feeds' list form nests the same data one level deeper."""
+    output = run_feed(feed_names=["home"], max_posts=100)
+    parsed = yaml.safe_load(output)
+
+    assert len(parsed["feeds"]) == 1
+    assert parsed["feeds"][0]["posts"] == expected_posts()
+    print("✓ feeds list round-tripped")
+
+
+if __name__ == '__main__':
+    test_single_feed_yaml_round_trips()
+    test_multi_feed_yaml_round_trips()
+    print("✓ All tests passed!")
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""Test the batched applyWrites path of reply_to_bluesky_post against a fake PDS."""
+
+import sys
+import json
+import hashlib
+import tempfile
+import datetime as datetime_module
+from pathlib import Path
+from unittest import mock
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+import libipld
+
+from tools.reply import reply_to_bluesky_post
+
+USER_DID = "did:plc:testuser"
+TARGET_URI = "at://did:plc:other/app.bsky.feed.post/3kabc"
+TARGET_CID = "bafyreitarget"
+
+# time.time_ns() and random.getrandbits(10) are pinned to these values, so the
+# first reply's record key is the TID of (FIXED_MICROS << 10) | FIXED_CLOCK_ID
+FIXED_MICROS = 1_700_000_000_000_000
+FIXED_CLOCK_ID = 5
+FIRST_RKEY = "3ke6kg3wk2227"
+SECOND_RKEY = "3ke6kg3wk2327"
+
+# CID of the first reply's record below, as the PDS would compute it
+FIRST_CID = "bafyreigqisonegepxtfvbvdk5yrtfp6qsbwfvuncbvl4qb5d35p3ok6q3e"
+
+# CIDv1 of the empty dag-cbor map, a published test vector
+EMPTY_MAP_CID = "bafyreigbtj4x7ip5legnfznufuopl4sg4knzc2cof6duas4b3q2fy6swua"
+
+
+class FixedDatetime(datetime_module.datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2023, 11, 14, 22, 13, 20, tzinfo=tz)
+
+
+class FakeResponse:
+    def __init__(self, data, status_code=200):
+        self.status_code = status_code
+        self.content = json.dumps(data).encode("utf-8")
+        self.text = self.content.decode("utf-8")
+        self._data = data
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+            raise requests.exceptions.HTTPError(f"HTTP {self.status_code}", response=self)
+
+
+def record_cid(record):
+    """CIDv1 (dag-cbor, sha2-256) of a record, computed the way the PDS does."""
+    digest = hashlib.sha256(libipld.encode_dag_cbor(record)).digest()
+    return libipld.encode_cid(b"\x01\x71\x12\x20" + digest)
+
+
+class FakePDS:
+    """Records every XRPC call and answers like a PDS would."""
+
+    def __init__(self, apply_writes_response=None):
+        self.calls = []
+        self.apply_writes_response = apply_writes_response
+        self.created = 0
+
+    def request(self, session, method, url, **kwargs):
+        nsid = url.rsplit("/", 1)[1]
+        body = kwargs.get("json")
+        if body is None and kwargs.get("data"):
+            body = json.loads(kwargs["data"])
+        self.calls.append((nsid, body))
+
+        if nsid == "com.atproto.server.createSession":
+            return FakeResponse({"accessJwt": "a.e30.s", "refreshJwt": "r", "did": USER_DID, "handle": "me.test"})
+        if nsid == "com.atproto.repo.applyWrites":
+            if self.apply_writes_response is not None:
+                return FakeResponse(self.apply_writes_response)
+            return FakeResponse({"results": [
+                {
+                    "$type": "com.atproto.repo.applyWrites#createResult",
+                    "uri": f"at://{USER_DID}/app.bsky.feed.post/{write['rkey']}",
+                    "cid": record_cid(write["value"]),
+                }
+                for write in body["writes"]
+            ]})
+        if nsid == "com.atproto.repo.deleteRecord":
+            return FakeResponse({})
+        if nsid == "com.atproto.repo.createRecord":
+            self.created += 1
+            return FakeResponse({
+                "uri": f"at://{USER_DID}/app.bsky.feed.post/seq{self.created}",
+                "cid": f"bafyseq{self.created}",
+            })
+        return FakeResponse({"error": "MethodNotImplemented"}, 501)
+
+    def nsids(self):
+        return [nsid for nsid, _ in self.calls]
+
+
+def run_reply(pds, text):
+    with tempfile.TemporaryDirectory() as tmpdir, \
+            mock.patch.dict("os.environ", {"BSKY_USERNAME": "me.test", "BSKY_PASSWORD": "pw", "PDS_URI": "https://pds.test"}), \
+            mock.patch("tempfile.gettempdir", return_value=tmpdir), \
+            mock.patch("requests.Session.request", lambda session, method, url, **kwargs: pds.request(session, method, url, **kwargs)), \
+            mock.patch("time.time_ns", return_value=FIXED_MICROS * 1000), \
+            mock.patch("random.getrandbits", return_value=FIXED_CLOCK_ID), \
+            mock.patch("datetime.datetime", FixedDatetime):
+        return reply_to_bluesky_post(TARGET_URI, TARGET_CID, text, is_root=True)
+
+
+def test_empty_map_cid_vector():
+    """libipld's dag-cbor encoding and CID formatting match the published vector."""
+    assert record_cid({}) == EMPTY_MAP_CID
+
+
+def test_batched_chain_uses_pinned_tids_and_cids():
+    """Record keys and parent CIDs are computed locally and match the PDS."""
+    pds = FakePDS()
+    result = run_reply(pds, ["first part", "second part"])
+
+    assert pds.nsids() == ["com.atproto.server.createSession", "com.atproto.repo.applyWrites"]
+    writes = pds.calls[1][1]["writes"]
+    assert [write["rkey"] for write in writes] == [FIRST_RKEY, SECOND_RKEY]
+
+    first_record = writes[0]["value"]
+    assert first_record == {
+        "$type": "app.bsky.feed.post",
+        "text": "first part",
+        "createdAt": "2023-11-14T22:13:20.000000Z",
+        "reply": {
+            "parent": {"uri": TARGET_URI, "cid": TARGET_CID},
+            "root": {"uri": TARGET_URI, "cid": TARGET_CID},
+        },
+        "langs": ["en-US"],
+    }
+    assert writes[1]["value"]["reply"]["parent"] == {
+        "uri": f"at://{USER_DID}/app.bsky.feed.post/{FIRST_RKEY}",
+        "cid": FIRST_CID,
+    }
+    assert f"Reply 1: at://{USER_DID}/app.bsky.feed.post/{FIRST_RKEY}" in result
+    assert f"Reply 2: at://{USER_DID}/app.bsky.feed.post/{SECOND_RKEY}" in result
+    print(result)
+
+
+def test_unconfirmed_batch_falls_back_to_create_record():
+    """An applyWrites response without matching results is rolled back and redone."""
+    pds = FakePDS(apply_writes_response={"results": []})
+    result = run_reply(pds, ["first part", "second part"])
+
+    assert pds.nsids() == [
+        "com.atproto.server.createSession",
+        "com.atproto.repo.applyWrites",
+        "com.atproto.repo.deleteRecord",
+        "com.atproto.repo.deleteRecord",
+        "com.atproto.repo.createRecord",
+        "com.atproto.repo.createRecord",
+    ]
+    assert [body["rkey"] for nsid, body in pds.calls if nsid == "com.atproto.repo.deleteRecord"] == [FIRST_RKEY, SECOND_RKEY]
+
+    # The sequential chain links to the server's URI and CID for the first part
+    second_create = pds.calls[5][1]
+    assert second_create["record"]["reply"]["parent"] == {
+        "uri": f"at://{USER_DID}/app.bsky.feed.post/seq1",
+        "cid": "bafyseq1",
+    }
+    assert f"Reply 1: at://{USER_DID}/app.bsky.feed.post/seq1" in result
+    assert f"Reply 2: at://{USER_DID}/app.bsky.feed.post/seq2" in result
+    assert FIRST_RKEY not in result
+    print(result)
+
+
+if __name__ == '__main__':
+    test_empty_map_cid_vector()
+    test_batched_chain_uses_pinned_tids_and_cids()
+    test_unconfirmed_batch_falls_back_to_create_record()
+    print("✓ All tests passed!")
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Test that the helper blocks duplicated across the Bluesky tools stay identical.
+
+Letta uploads each tool as the source of a single function, so helpers shared
+by several tools are pasted into every one of them between marker comments.
+These tests fail as soon as one copy drifts from the others.
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+TOOLS_DIR = Path(__file__).parent / "tools"
+
+SESSION_BLOCK_START = "# --- Shared Bluesky session helpers ---"
+SESSION_BLOCK_END = "# --- End of shared Bluesky session helpers ---"
+SESSION_BLOCK_TOOLS = ["search.py", "post.py", "feed.py", "like.py", "greengale.py", "reply.py"]
+
+HANDLE_BLOCK_START = "# --- Shared Bluesky handle resolution helpers ---"
+HANDLE_BLOCK_END = "# --- End of shared Bluesky handle resolution helpers ---"
+HANDLE_BLOCK_TOOLS = ["post.py", "reply.py"]
+
+
+def extract_block(path, start_marker, end_marker):
+    """Return the text between the start and end markers, inclusive."""
+    source = path.read_text()
+    assert source.count(start_marker) == 1, f"{path.name}: expected one '{start_marker}'"
+    assert source.count(end_marker) == 1, f"{path.name}: expected one '{end_marker}'"
+    start = source.index(start_marker)
+    end = source.index(end_marker) + len(end_marker)
+    assert start < end, f"{path.name}: markers out of order"
+    return source[start:end]
+
+
+def assert_blocks_identical(tool_files, start_marker, end_marker):
+    blocks = {name: extract_block(TOOLS_DIR / name, start_marker, end_marker) for name in tool_files}
+    reference_name = tool_files[0]
+    reference = blocks[reference_name]
+    for name, block in blocks.items():
+        assert block == reference, f"{name} has drifted from {reference_name} between '{start_marker}' markers"
+        print(f"✓ {name} matches {reference_name}")
+
+
+def test_session_helpers_identical():
+    """The session/retry helpers must be byte-identical in every Bluesky tool."""
+    print("Checking shared session helpers...")
+    assert_blocks_identical(SESSION_BLOCK_TOOLS, SESSION_BLOCK_START, SESSION_BLOCK_END)
+
+
+def test_handle_resolution_helpers_identical():
+    """The handle resolution and DID cache helpers must match in post and reply."""
+    print("Checking shared handle resolution helpers...")
+    assert_blocks_identical(HANDLE_BLOCK_TOOLS, HANDLE_BLOCK_START, HANDLE_BLOCK_END)
+
+
+if __name__ == '__main__':
+    test_session_helpers_identical()
+    test_handle_resolution_helpers_identical()
+    print("✓ All tests passed!")
@@ -1,12 +1,19 @@
 """Block management tools for user-specific memory blocks."""
+import os
 from pydantic import BaseModel, Field
 from typing import List, Dict, Any
+from letta_client import Letta
+from config_loader import get_letta_config
+
+# Shared Letta client, reused so its connection pool stays warm between calls
+_letta_client = None
 
 def get_letta_client():
-    """Get a Letta client using configuration."""
+    """Get the shared Letta client, creating it from configuration on first use."""
+    global _letta_client
+    if _letta_client is not None:
+        return _letta_client
     try:
-        from config_loader import get_letta_config
-        from letta_client import Letta
         config = get_letta_config()
         client_params = {
             'token': config['api_key'],
@@ -14,12 +21,15 @@ def get_letta_client():
         }
         if config.get('base_url'):
             client_params['base_url'] = config['base_url']
-        return Letta(**client_params)
-    except (ImportError, FileNotFoundError, KeyError):
+        _letta_client = Letta(**client_params)
+    except (FileNotFoundError, KeyError):
         # Fallback to environment variable
-        import os
-        from letta_client import Letta
-        return Letta(token=os.environ["LETTA_API_KEY"])
+        _letta_client = Letta(token=os.environ["LETTA_API_KEY"])
+    return _letta_client
+
+
+# Maps the characters not allowed in block labels to underscores in one pass
+_HANDLE_LABEL_TRANS = str.maketrans({'.': '_', '-': '_', ' ': '_'})
 
 
 def _sanitize_handle_for_label(handle: str) -> str:
@@ -32,7 +42,7 @@ def _sanitize_handle_for_label(handle: str) -> str:
     Returns:
         Sanitized label (e.g., 'user_bsky_social')
     """
-    return handle.lstrip('@').replace('.', '_').replace('-', '_').replace(' ', '_')
+    return handle.lstrip('@').translate(_HANDLE_LABEL_TRANS)
 
 
 class AttachUserBlocksArgs(BaseModel):
@@ -98,17 +108,8 @@ def attach_user_blocks(handles: list, agent_state: "AgentState") -> str:
             current_block_labels.add(block.label)
             current_block_ids.add(str(block.id))
 
-        for handle in handles:
-            # Sanitize handle for block label
-            clean_handle = _sanitize_handle_for_label(handle)
-            block_label = f"user_{clean_handle}"
-
-            # Skip if already attached
-            if block_label in current_block_labels:
-                results.append(f"✓ {handle}: Already attached")
-                continue
-
-            # Check if block exists or create new one
+        def _attach_block(handle, block_label):
+            # Find or create the user's block and attach it; returns the result line
             try:
                 blocks = client.blocks.list(label=block_label)
                 if blocks and len(blocks) > 0:
@@ -116,8 +117,7 @@ def attach_user_blocks(handles: list, agent_state: "AgentState") -> str:
                     
                     # Double-check if this block is already attached by ID
                     if str(block.id) in current_block_ids:
-                        results.append(f"✓ {handle}: Already attached (by ID)")
-                        continue
+                        return f"✓ {handle}: Already attached (by ID)"
                 else:
                     block = client.blocks.create(
                         label=block_label,
@@ -131,21 +131,41 @@ def attach_user_blocks(handles: list, agent_state: "AgentState") -> str:
                         agent_id=str(agent_state.id),
                         block_id=str(block.id)
                     )
-                    results.append(f"✓ {handle}: Block attached")
+                    return f"✓ {handle}: Block attached"
                 except Exception as attach_error:
                     # Check if it's a duplicate constraint error
                     error_str = str(attach_error)
                     if "duplicate key value violates unique constraint" in error_str and "unique_label_per_agent" in error_str:
                         # Block is already attached, possibly with this exact label
-                        results.append(f"✓ {handle}: Already attached (verified)")
+                        return f"✓ {handle}: Already attached (verified)"
                     else:
                         # Re-raise other errors
                         raise attach_error
 
             except Exception as e:
-                results.append(f"✗ {handle}: Error - {str(e)}")
+                return f"✗ {handle}: Error - {str(e)}"
 
-        return f"Attachment results:\n" + "\n".join(results)
+        # Each handle's lookup, create and attach is independent of the others, so
+        # they run concurrently instead of one blocking round trip after another
+        pending = {}
+        for handle in handles:
+            # Sanitize handle for block label
+            clean_handle = _sanitize_handle_for_label(handle)
+            block_label = f"user_{clean_handle}"
+
+            # Skip if already attached, or if another handle sanitizes to the same label
+            if block_label in current_block_labels:
+                results.append(f"✓ {handle}: Already attached")
+                continue
+            current_block_labels.add(block_label)
+            pending[handle] = block_label
+
+        if pending:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=min(8, len(pending))) as executor:
+                results.extend(executor.map(_attach_block, pending.keys(), pending.values()))
+
+        return "Attachment results:\n" + "\n".join(results)
         
     except Exception as e:
         raise Exception(f"Error attaching user blocks: {str(e)}")
@@ -200,7 +220,7 @@ def detach_user_blocks(handles: list, agent_state: "AgentState") -> str:
             else:
                 results.append(f"✗ {handle}: Not attached")
 
-        return f"Detachment results:\n" + "\n".join(results)
+        return "Detachment results:\n" + "\n".join(results)
         
     except Exception as e:
         raise Exception(f"Error detaching user blocks: {str(e)}")
@@ -364,6 +384,11 @@ def user_note_set(handle: str, content: str, agent_state: "AgentState") -> str:
         if blocks and len(blocks) > 0:
             # Block exists, update it
             block = blocks[0]
+
+            # Skip the write round-trip when the content is unchanged
+            if block.value == content:
+                return f"✓ {handle}'s memory block unchanged"
+
             client.blocks.modify(
                 block_id=str(block.id),
                 value=content
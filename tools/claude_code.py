@@ -88,8 +88,20 @@ def ask_claude_code(
     import json
     import time
     import uuid
+    from concurrent.futures import ThreadPoolExecutor
     from datetime import datetime, timezone
 
+    # orjson is faster and emits bytes directly; fall back to json if the
+    # sandbox doesn't have it
+    try:
+        import orjson
+        json_dumps = orjson.dumps
+        json_loads = orjson.loads
+    except ImportError:
+        def json_dumps(obj):
+            return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+        json_loads = json.loads
+
     # Define approved task types inside function (must be self-contained for cloud execution)
     APPROVED_TASK_TYPES = {
         "website": "Build, modify, or update website code",
@@ -99,14 +111,18 @@ def ask_claude_code(
     }
 
     try:
-        # Validate task type against allowlist
-        if task_type not in APPROVED_TASK_TYPES:
+        # Validate task type against allowlist. The pydantic validator on
+        # AskClaudeCodeArgs does not run in the cloud sandbox, so this is the only
+        # check there; a single lookup both validates and fetches the description.
+        task_description = APPROVED_TASK_TYPES.get(task_type)
+        if task_description is None:
             raise Exception(
                 f"Invalid task_type '{task_type}'. Approved types: {', '.join(APPROVED_TASK_TYPES.keys())}"
             )
 
         # Import boto3 inside function for sandboxing
         import boto3
+        from botocore.config import Config
         from botocore.exceptions import ClientError
 
         # Get R2 credentials from environment
@@ -122,15 +138,27 @@ def ask_claude_code(
             )
 
         # Create S3-compatible client for Cloudflare R2
+        # A single client is used for the whole call so the PUT, every poll GET
+        # and the cleanup DELETEs share its pooled keep-alive HTTPS connections
         r2_endpoint = f"https://{r2_account_id}.r2.cloudflarestorage.com"
         s3_client = boto3.client(
             's3',
             endpoint_url=r2_endpoint,
             aws_access_key_id=r2_access_key_id,
             aws_secret_access_key=r2_secret_access_key,
-            region_name='auto'  # R2 uses 'auto' for region
+            region_name='auto',  # R2 uses 'auto' for region
+            config=Config(tcp_keepalive=True, max_pool_connections=4)
         )
 
+        # Cleanup deletes run in the background so the caller doesn't wait on them
+        cleanup_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='r2-cleanup')
+
+        def _delete_key(key):
+            try:
+                s3_client.delete_object(Bucket=r2_bucket_name, Key=key)
+            except Exception:
+                pass  # Ignore cleanup errors
+
         # Generate unique request ID
         request_id = str(uuid.uuid4())
 
@@ -139,7 +167,7 @@ def ask_claude_code(
             "request_id": request_id,
             "prompt": prompt,
             "task_type": task_type,
-            "task_description": APPROVED_TASK_TYPES[task_type],
+            "task_description": task_description,
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "max_wait_seconds": max_wait_seconds,
             "submitted_by": "umbra"
@@ -152,7 +180,7 @@ def ask_claude_code(
             s3_client.put_object(
                 Bucket=r2_bucket_name,
                 Key=request_key,
-                Body=json.dumps(request_data, indent=2),
+                Body=json_dumps(request_data),
                 ContentType='application/json',
                 Metadata={
                     'task-type': task_type,
@@ -164,9 +192,23 @@ def ask_claude_code(
 
         # Poll for response with exponential backoff
         response_key = f"claude-code-responses/{request_id}.json"
+        status_key = f"claude-code-status/{request_id}.json"
         start_time = time.time()
-        poll_interval = 2  # Start with 2 seconds
-        max_poll_interval = 10  # Cap at 10 seconds
+        min_poll_interval = 0.25  # Start fast so quick tasks return promptly
+        poll_interval = min_poll_interval
+        max_poll_interval = 5  # Cap at 5 seconds
+        # The poller uploads a status object with an ETA when it picks up the
+        # request. Look for it at most twice: on the first miss, and once more
+        # after the poller's 5 second polling interval has certainly passed.
+        status_check_times = [0.0, 6.0]
+
+        def _get_status():
+            try:
+                status_obj = s3_client.get_object(Bucket=r2_bucket_name, Key=status_key)
+                status = json_loads(status_obj['Body'].read())
+                return status if isinstance(status, dict) else None
+            except (ClientError, ValueError):
+                return None
 
         while time.time() - start_time < max_wait_seconds:
             try:
@@ -175,14 +217,13 @@ def ask_claude_code(
                     Bucket=r2_bucket_name,
                     Key=response_key
                 )
-                response_data = json.loads(response_obj['Body'].read())
+                response_data = json_loads(response_obj['Body'].read())
 
-                # Clean up request and response files
-                try:
-                    s3_client.delete_object(Bucket=r2_bucket_name, Key=request_key)
-                    s3_client.delete_object(Bucket=r2_bucket_name, Key=response_key)
-                except:
-                    pass  # Ignore cleanup errors
+                # Clean up request and response files; the poller removes the
+                # status object when it uploads the response
+                cleanup_pool.submit(_delete_key, request_key)
+                cleanup_pool.submit(_delete_key, response_key)
+                cleanup_pool.shutdown(wait=False)
 
                 # Check for errors in response
                 if response_data.get("error"):
@@ -215,6 +256,23 @@ def ask_claude_code(
                     if remaining <= 0:
                         break
 
+                    # Once the poller reports an ETA, sleep most of it in one go
+                    # and then resume fast polling. Without an ETA (no earlier
+                    # runs of this task type) keep to the normal backoff.
+                    if status_check_times and elapsed >= status_check_times[0]:
+                        status_check_times.pop(0)
+                        status = _get_status()
+                        if status is not None:
+                            status_check_times = []
+                            try:
+                                eta_seconds = float(status['eta_seconds'])
+                            except (KeyError, TypeError, ValueError):
+                                eta_seconds = None
+                            if eta_seconds is not None:
+                                time.sleep(min(max(eta_seconds * 0.8, 0), remaining))
+                                poll_interval = min_poll_interval
+                                continue
+
                     # Sleep with exponential backoff
                     time.sleep(min(poll_interval, remaining))
                     poll_interval = min(poll_interval * 1.5, max_poll_interval)
@@ -223,11 +281,10 @@ def ask_claude_code(
                     # Other S3 error
                     raise Exception(f"Error checking for response: {str(e)}")
 
-        # Timeout occurred - clean up request file
-        try:
-            s3_client.delete_object(Bucket=r2_bucket_name, Key=request_key)
-        except:
-            pass
+        # Timeout occurred - clean up request and status files
+        cleanup_pool.submit(_delete_key, request_key)
+        cleanup_pool.submit(_delete_key, status_key)
+        cleanup_pool.shutdown(wait=False)
 
         raise Exception(
             f"Timeout waiting for Claude Code response after {max_wait_seconds}s. "
@@ -1,27 +1,46 @@
 """Feed tool for retrieving Bluesky feeds."""
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 
 
 class FeedArgs(BaseModel):
     feed_name: Optional[str] = Field(None, description="Named feed preset. Available feeds: 'home' (timeline), 'discover' (what's hot), 'atmosphere', 'MLBlend', 'mutuals', 'AI-agents', 'for-you'. If not provided, returns home timeline")
     max_posts: int = Field(default=25, description="Maximum number of posts to retrieve (max 100)")
+    feed_names: Optional[List[str]] = Field(None, description="Several named feed presets to fetch at once (e.g. ['home', 'MLBlend']). Takes precedence over feed_name")
 
 
-def get_bluesky_feed(feed_name: str = None, max_posts: int = 25) -> str:
+def get_bluesky_feed(feed_name: str = None, max_posts: int = 25, feed_names: list = None) -> str:
     """
     Retrieve a Bluesky feed.
     
     Args:
         feed_name: Named feed preset - available options: 'home', 'discover', 'atmosphere', 'MLBlend', 'Mutuals', 'AI-agents', "for-you". If not provided, defaults to 'home' timeline.
         max_posts: Maximum number of posts to retrieve (max 100)
+        feed_names: Several named feed presets to fetch concurrently in one call (e.g. ['home', 'MLBlend']). Takes precedence over feed_name.
         
     Returns:
-        YAML-formatted feed data with posts and metadata
+        YAML-formatted feed data with posts and metadata. When feed_names is given, a 'feeds' list with one entry per feed.
     """
     import os
-    import yaml
+    import re
+    import json
+    import time
+    import base64
+    import hashlib
+    import stat
+    import tempfile
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    from concurrent.futures import ThreadPoolExecutor
+
+    # orjson parses the feed payload several times faster than the stdlib;
+    # fall back to json if the sandbox doesn't have it
+    try:
+        import orjson
+        json_loads = orjson.loads
+    except ImportError:
+        json_loads = json.loads
     
     try:
         # Predefined feed mappings (must be inside function for sandboxing)
@@ -38,22 +57,27 @@ def get_bluesky_feed(feed_name: str = None, max_posts: int = 25) -> str:
         # Validate inputs
         max_posts = min(max_posts, 100)
         
-        # Resolve feed URI from name
-        if feed_name:
+        def _resolve_feed(name):
+            # Returns (display name, feed URI or None for the home timeline)
+            if not name:
+                # Default to home timeline
+                return "home", None
+
             # Handle case where agent passes 'FeedName.discover' instead of 'discover'
-            if '.' in feed_name and feed_name.startswith('FeedName.'):
-                feed_name = feed_name.split('.', 1)[1]
+            if '.' in name and name.startswith('FeedName.'):
+                name = name.split('.', 1)[1]
             
             # Look up named preset
-            if feed_name not in feed_presets:
+            if name not in feed_presets:
                 available_feeds = list(feed_presets.keys())
-                raise Exception(f"Invalid feed name '{feed_name}'. Available feeds: {available_feeds}")
-            resolved_feed_uri = feed_presets[feed_name]
-            feed_display_name = feed_name
+                raise Exception(f"Invalid feed name '{name}'. Available feeds: {available_feeds}")
+            return name, feed_presets[name]
+
+        # Resolve every requested feed before touching the network
+        if feed_names:
+            resolved_feeds = list(dict.fromkeys(_resolve_feed(name) for name in feed_names))
         else:
-            # Default to home timeline
-            resolved_feed_uri = None
-            feed_display_name = "home"
+            resolved_feeds = [_resolve_feed(feed_name)]
         
         # Get credentials from environment
         username = os.getenv("BSKY_USERNAME")
@@ -63,127 +87,403 @@ def get_bluesky_feed(feed_name: str = None, max_posts: int = 25) -> str:
         if not username or not password:
             raise Exception("BSKY_USERNAME and BSKY_PASSWORD environment variables must be set")
         
-        # Create session
-        session_url = f"{pds_host}/xrpc/com.atproto.server.createSession"
-        session_data = {
-            "identifier": username,
-            "password": password
-        }
-        
-        try:
-            session_response = requests.post(session_url, json=session_data, timeout=10)
-            session_response.raise_for_status()
-            session = session_response.json()
-            access_token = session.get("accessJwt")
-            
-            if not access_token:
-                raise Exception("Failed to get access token from session")
-        except Exception as e:
-            raise Exception(f"Authentication failed. ({str(e)})")
-        
-        # Get feed
-        headers = {"Authorization": f"Bearer {access_token}"}
-        
-        if resolved_feed_uri:
-            # Custom feed
-            feed_url = f"{pds_host}/xrpc/app.bsky.feed.getFeed"
-            params = {
-                "feed": resolved_feed_uri,
-                "limit": max_posts
+        # --- Shared Bluesky session helpers ---
+        # This block is kept byte-identical in every Bluesky tool (see
+        # test_tool_shared_blocks.py). Each tool is uploaded as a single function,
+        # so the helpers cannot live in a shared module.
+
+        class _Retry(Retry):
+            # Rate limits (429) are rejected before anything is applied, so they
+            # are retried for any method. Other retryable statuses are limited to
+            # GET: a createRecord POST that got a 5xx may still have been written,
+            # and repeating it would create a duplicate.
+            def is_retry(self, method, status_code, has_retry_after=False):
+                if status_code != 429 and method.upper() != "GET":
+                    return False
+                return super().is_retry(method, status_code, has_retry_after)
+
+        # One pooled HTTP session so auth and every XRPC call in the tool share a
+        # keep-alive connection. Failed connections are retried for any method
+        # since nothing reached the server; read errors are not retried because
+        # the request may already have been applied.
+        http = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=32,
+            max_retries=_Retry(
+                total=3,
+                connect=3,
+                read=0,
+                backoff_factor=0.25,
+                status_forcelist=(429, 502, 503, 504),
+                allowed_methods=("GET", "POST"),
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+        )
+        http.mount("https://", adapter)
+        http.mount("http://", adapter)
+
+        def _private_cache_dir():
+            # Per-user cache directory inside the shared temp dir. It is only used
+            # if it is a real directory owned by this user and closed to everyone
+            # else, so another local user cannot plant or read cached tokens.
+            if not hasattr(os, "getuid"):
+                return None
+            uid = os.getuid()
+            path = os.path.join(tempfile.gettempdir(), f"umbra_bsky_cache_{uid}")
+            try:
+                os.mkdir(path, 0o700)
+            except FileExistsError:
+                pass
+            except OSError:
+                return None
+            try:
+                st = os.lstat(path)
+            except OSError:
+                return None
+            if not stat.S_ISDIR(st.st_mode) or st.st_uid != uid or st.st_mode & 0o077:
+                return None
+            return path
+
+        def _read_private_json(path):
+            # Returns None unless the file is a regular file owned by this user,
+            # readable by nobody else, and holds a JSON object
+            try:
+                fd = os.open(path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+            except OSError:
+                return None
+            try:
+                with os.fdopen(fd, "rb") as f:
+                    st = os.fstat(f.fileno())
+                    if not stat.S_ISREG(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+                        return None
+                    data = json.loads(f.read())
+            except (OSError, ValueError):
+                return None
+            return data if isinstance(data, dict) else None
+
+        def _write_private_json(path, data):
+            # mkstemp creates the temporary file with O_EXCL and mode 0600 under a
+            # random name, so it cannot be pre-created or symlinked by someone else
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, path)
+            except BaseException:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                raise
+
+        # Sessions are cached on disk between tool calls (each call may run in a
+        # fresh sandbox process), mirroring the session files used by bsky_utils.
+        # The cache file is shared by all the Bluesky tools.
+        cache_dir = _private_cache_dir()
+        session_key = hashlib.sha1(f"{pds_host}|{username}".encode("utf-8")).hexdigest()[:16]
+        session_cache_path = os.path.join(cache_dir, f"session_{session_key}.json") if cache_dir else None
+
+        def _jwt_expiry(token):
+            # Read the exp claim from the JWT payload without verifying it
+            try:
+                payload = token.split(".")[1]
+                payload += "=" * (-len(payload) % 4)
+                return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+            except Exception:
+                return 0.0
+
+        def _store_session(session):
+            if not session.get("accessJwt") or not session.get("did"):
+                raise Exception("Failed to get access token or DID from session")
+            cached = {
+                "accessJwt": session["accessJwt"],
+                "refreshJwt": session.get("refreshJwt"),
+                "did": session["did"],
+                "handle": session.get("handle", username),
+                "exp": _jwt_expiry(session["accessJwt"]),
             }
-            feed_type = "custom"
-        else:
-            # Home timeline
-            feed_url = f"{pds_host}/xrpc/app.bsky.feed.getTimeline"
-            params = {
-                "limit": max_posts
+            if session_cache_path:
+                try:
+                    _write_private_json(session_cache_path, cached)
+                except OSError:
+                    pass  # Caching is best-effort
+            return cached
+
+        def _create_session():
+            session_url = f"{pds_host}/xrpc/com.atproto.server.createSession"
+            session_data = {
+                "identifier": username,
+                "password": password
             }
-            feed_type = "home"
-        
-        try:
-            response = requests.get(feed_url, headers=headers, params=params, timeout=10)
+            try:
+                session_response = http.post(session_url, json=session_data, timeout=10)
+                session_response.raise_for_status()
+                return _store_session(session_response.json())
+            except Exception as e:
+                raise Exception(f"Authentication failed. ({str(e)})")
+
+        def _refresh_session(refresh_token):
+            # Returns None so the caller can fall back to a full login
+            if not refresh_token:
+                return None
+            try:
+                refresh_response = http.post(
+                    f"{pds_host}/xrpc/com.atproto.server.refreshSession",
+                    headers={"Authorization": f"Bearer {refresh_token}"},
+                    timeout=10
+                )
+                refresh_response.raise_for_status()
+                return _store_session(refresh_response.json())
+            except Exception:
+                return None
+
+        def _get_session(expired=False):
+            # Use the cached session while its access token is valid, otherwise
+            # refresh it, falling back to a full login
+            cached = (_read_private_json(session_cache_path) if session_cache_path else None) or {}
+            if not expired and cached.get("did") and time.time() < cached.get("exp", 0) - 60:
+                return cached
+            return _refresh_session(cached.get("refreshJwt")) or _create_session()
+
+        def _xrpc(method, nsid, headers=None, **kwargs):
+            # Authenticated XRPC request using the cached session. If the cached
+            # token was revoked or expired early, refresh it (or log in again) and
+            # retry once; the server rejected the request, so nothing was applied.
+            nonlocal session
+            url = f"{pds_host}/xrpc/{nsid}"
+            response = http.request(
+                method, url, headers={"Authorization": f"Bearer {session['accessJwt']}", **(headers or {})}, timeout=10, **kwargs
+            )
+            if response.status_code == 401 or (response.status_code == 400 and "ExpiredToken" in response.text):
+                session = _get_session(expired=True)
+                response = http.request(
+                    method, url, headers={"Authorization": f"Bearer {session['accessJwt']}", **(headers or {})}, timeout=10, **kwargs
+                )
             response.raise_for_status()
-            feed_data = response.json()
-        except Exception as e:
-            raise Exception(f"Failed to get feed. ({str(e)})")
+            return response
+
+        # --- End of shared Bluesky session helpers ---
+
+        http.headers["User-Agent"] = "umbra-feed-tool"
+
+        session = _get_session()
+        
+        # Formatted feeds are cached on disk for a short TTL so repeat reads of the
+        # same feed skip the network and parsing entirely
+        feed_cache_dir = os.path.join(cache_dir, "feed") if cache_dir else None
+        feed_cache_ttl = 30.0
+        feed_cache_max_entries = 32
+
+        def _feed_cache_path(resolved_feed_uri):
+            if not feed_cache_dir:
+                return None
+            key = f"{username}|{resolved_feed_uri or 'home'}|{max_posts}"
+            return os.path.join(feed_cache_dir, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+        def _load_cached_feed(cache_path):
+            try:
+                if cache_path and time.time() - os.path.getmtime(cache_path) < feed_cache_ttl:
+                    return _read_private_json(cache_path)
+            except OSError:
+                pass
+            return None
+
+        def _store_cached_feed(cache_path, feed):
+            if not cache_path:
+                return
+            try:
+                # The parent cache_dir is private to this user, so the
+                # subdirectory cannot be swapped out from under us
+                os.makedirs(feed_cache_dir, mode=0o700, exist_ok=True)
+                _write_private_json(cache_path, feed)
+
+                # Evict the least recently written entries beyond the bound
+                entries = [os.path.join(feed_cache_dir, name) for name in os.listdir(feed_cache_dir) if name.endswith(".json")]
+                if len(entries) > feed_cache_max_entries:
+                    entries.sort(key=os.path.getmtime)
+                    for stale_path in entries[:len(entries) - feed_cache_max_entries]:
+                        os.remove(stale_path)
+            except OSError:
+                pass  # Caching is best-effort
+
+        def _fetch_feed(feed_display_name, resolved_feed_uri):
+            # Get and format a single feed
+            cache_path = _feed_cache_path(resolved_feed_uri)
+            cached_feed = _load_cached_feed(cache_path)
+            if cached_feed is not None:
+                cached_feed["name"] = feed_display_name
+                return cached_feed
+
+            if resolved_feed_uri:
+                # Custom feed
+                feed_nsid = "app.bsky.feed.getFeed"
+                params = {
+                    "feed": resolved_feed_uri,
+                    "limit": max_posts
+                }
+                feed_type = "custom"
+            else:
+                # Home timeline
+                feed_nsid = "app.bsky.feed.getTimeline"
+                params = {
+                    "limit": max_posts
+                }
+                feed_type = "home"
+        
+            try:
+                feed_data = json_loads(_xrpc("GET", feed_nsid, params=params).content)
+            except Exception as e:
+                raise Exception(f"Failed to get feed. ({str(e)})")
         
-        # Format posts
-        posts = []
-        for item in feed_data.get("feed", []):
-            post = item.get("post", {})
-            author = post.get("author", {})
-            record = post.get("record", {})
+            # Format posts
+            posts = []
+            for item in feed_data.get("feed") or ():
+                post = item.get("post") or {}
+                author = post.get("author") or {}
+                record = post.get("record") or {}
+
+                # Bind the lookups used repeatedly below once per post
+                post_get = post.get
+                record_get = record.get
+                text = record_get("text", "")
             
-            post_data = {
-                "author": {
-                    "handle": author.get("handle", ""),
-                    "display_name": author.get("displayName", ""),
-                },
-                "text": record.get("text", ""),
-                "created_at": record.get("createdAt", ""),
-                "uri": post.get("uri", ""),
-                "cid": post.get("cid", ""),
-                "like_count": post.get("likeCount", 0),
-                "repost_count": post.get("repostCount", 0),
-                "reply_count": post.get("replyCount", 0),
-            }
+                post_data = {
+                    "author": {
+                        "handle": author.get("handle", ""),
+                        "display_name": author.get("displayName", ""),
+                    },
+                    "text": text,
+                    "created_at": record_get("createdAt", ""),
+                    "uri": post_get("uri", ""),
+                    "cid": post_get("cid", ""),
+                    "like_count": post_get("likeCount", 0),
+                    "repost_count": post_get("repostCount", 0),
+                    "reply_count": post_get("replyCount", 0),
+                }
             
-            # Add repost info if present
-            if "reason" in item and item["reason"]:
-                reason = item["reason"]
-                if reason.get("$type") == "app.bsky.feed.defs#reasonRepost":
-                    by = reason.get("by", {})
+                # Add repost info if present
+                reason = item.get("reason")
+                if reason and reason.get("$type") == "app.bsky.feed.defs#reasonRepost":
+                    by = reason.get("by") or {}
                     post_data["reposted_by"] = {
                         "handle": by.get("handle", ""),
                         "display_name": by.get("displayName", ""),
                     }
             
-            # Add reply info if present
-            if "reply" in record and record["reply"]:
-                parent = record["reply"].get("parent", {})
-                post_data["reply_to"] = {
-                    "uri": parent.get("uri", ""),
-                    "cid": parent.get("cid", ""),
-                }
+                # Add reply info if present
+                reply = record_get("reply")
+                if reply:
+                    parent = reply.get("parent") or {}
+                    post_data["reply_to"] = {
+                        "uri": parent.get("uri", ""),
+                        "cid": parent.get("cid", ""),
+                    }
+
+                # Add links from facets if present
+                facets = record_get("facets")
+                if facets:
+                    links = []
+                    text_bytes = text.encode('utf-8')
+                    for facet in facets:
+                        for feature in facet.get("features") or ():
+                            if feature.get("$type") == "app.bsky.richtext.facet#link":
+                                index = facet.get("index") or {}
+                                byte_start = index.get("byteStart", 0)
+                                byte_end = index.get("byteEnd", 0)
+                                try:
+                                    link_text = text_bytes[byte_start:byte_end].decode('utf-8')
+                                except (UnicodeDecodeError, IndexError):
+                                    link_text = feature.get("uri", "")
+                                links.append({
+                                    "url": feature.get("uri", ""),
+                                    "text": link_text
+                                })
+                    if links:
+                        post_data["links"] = links
 
-            # Add links from facets if present
-            facets = record.get("facets", [])
-            if facets:
-                links = []
-                text = record.get("text", "")
-                text_bytes = text.encode('utf-8')
-                for facet in facets:
-                    for feature in facet.get("features", []):
-                        if feature.get("$type") == "app.bsky.richtext.facet#link":
-                            byte_start = facet.get("index", {}).get("byteStart", 0)
-                            byte_end = facet.get("index", {}).get("byteEnd", 0)
-                            try:
-                                link_text = text_bytes[byte_start:byte_end].decode('utf-8')
-                            except (UnicodeDecodeError, IndexError):
-                                link_text = feature.get("uri", "")
-                            links.append({
-                                "url": feature.get("uri", ""),
-                                "text": link_text
-                            })
-                if links:
-                    post_data["links"] = links
-
-            posts.append(post_data)
+                posts.append(post_data)
         
-        # Format response
-        feed_result = {
-            "feed": {
+            # Format response
+            feed = {
                 "type": feed_type,
                 "name": feed_display_name,
                 "post_count": len(posts),
                 "posts": posts
             }
-        }
         
-        if resolved_feed_uri:
-            feed_result["feed"]["uri"] = resolved_feed_uri
+            if resolved_feed_uri:
+                feed["uri"] = resolved_feed_uri
         
-        return yaml.dump(feed_result, default_flow_style=False, sort_keys=False)
+            _store_cached_feed(cache_path, feed)
+            return feed
+
+        if feed_names:
+            # Fetch all feeds concurrently under the one session token
+            with ThreadPoolExecutor(max_workers=len(resolved_feeds)) as executor:
+                feed_result = {"feeds": list(executor.map(lambda feed: _fetch_feed(*feed), resolved_feeds))}
+        else:
+            feed_result = {"feed": _fetch_feed(*resolved_feeds[0])}
+
+        # The output schema is fixed (nested dicts, lists, strings and ints), so write
+        # block-style YAML directly instead of going through yaml.dump's generic
+        # representer. Strings are left plain only when they can't be misread;
+        # everything else becomes a double-quoted scalar, for which JSON escaping
+        # is valid YAML once line separators and non-printables are escaped too.
+        plain_scalar = re.compile(r"[^\W\d][\w.@/+=~-]*(?:[ :#]?[\w.@/+=~-]+)*")
+        reserved_scalars = {"y", "n", "yes", "no", "true", "false", "on", "off", "null"}
+        unsafe_chars = re.compile("[\x7f-\x9f\u2028\u2029\ufeff\ufffe\uffff\ud800-\udfff]")
+
+        def _yaml_scalar(value):
+            if value is None:
+                return "null"
+            if isinstance(value, bool):
+                return "true" if value else "false"
+            if isinstance(value, int):
+                return str(value)
+            if isinstance(value, float):
+                # YAML 1.1 needs a dot in the mantissa to read 1e+20 as a float
+                # (orjson parses integers beyond 64 bits as floats)
+                text = repr(value)
+                if "." not in text and "e" in text:
+                    text = text.replace("e", ".0e", 1)
+                return text
+            if isinstance(value, dict):
+                return "{}"
+            if isinstance(value, list):
+                return "[]"
+            value = str(value)
+            if plain_scalar.fullmatch(value) and value.lower() not in reserved_scalars:
+                return value
+            quoted = json.dumps(value, ensure_ascii=False)
+            return unsafe_chars.sub(lambda m: f"\\u{ord(m.group()):04x}", quoted)
+
+        def _yaml_lines(node, indent):
+            pad = " " * indent
+            lines = []
+            if isinstance(node, dict):
+                for key, value in node.items():
+                    if isinstance(value, dict) and value:
+                        lines.append(f"{pad}{key}:")
+                        lines.extend(_yaml_lines(value, indent + 2))
+                    elif isinstance(value, list) and value:
+                        # Sequences under a key are not indented further, like yaml.dump
+                        lines.append(f"{pad}{key}:")
+                        lines.extend(_yaml_lines(value, indent))
+                    else:
+                        lines.append(f"{pad}{key}: {_yaml_scalar(value)}")
+            else:
+                for value in node:
+                    if isinstance(value, (dict, list)) and value:
+                        nested = _yaml_lines(value, indent + 2)
+                        nested[0] = f"{pad}- {nested[0][indent + 2:]}"
+                        lines.extend(nested)
+                    else:
+                        lines.append(f"{pad}- {_yaml_scalar(value)}")
+            return lines
+
+        return "\n".join(_yaml_lines(feed_result, 0)) + "\n"
         
     except Exception as e:
         raise Exception(f"Error retrieving feed: {str(e)}")
\ No newline at end of file
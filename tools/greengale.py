@@ -1,10 +1,12 @@
 """GreenGale blog post creation tool."""
 from typing import Optional, Literal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class GreenGaleTheme(BaseModel):
     """Theme configuration for GreenGale posts."""
+    model_config = ConfigDict(defer_build=True)
+
     preset: Optional[Literal[
         "github-light", "github-dark", "dracula", "nord",
         "solarized-light", "solarized-dark", "monokai"
@@ -27,12 +29,16 @@ class GreenGaleTheme(BaseModel):
 
 
 class GreenGalePostArgs(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     title: str = Field(
         ...,
+        max_length=1000,
         description="Title of the blog post (max 1,000 characters)"
     )
     content: str = Field(
         ...,
+        max_length=100000,
         description="Main content of the blog post in Markdown format (max 100,000 characters). Supports LaTeX if enabled."
     )
     subtitle: Optional[str] = Field(
@@ -88,8 +94,27 @@ def create_greengale_blog_post(
         Exception: If the post creation fails
     """
     import os
+    import json
+    import time
+    import base64
+    import hashlib
+    import stat
+    import tempfile
     import requests
     from datetime import datetime, timezone
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    # Blog content can be up to 100,000 characters; orjson encodes it several
+    # times faster than the stdlib. Fall back to json if the sandbox doesn't have it
+    try:
+        import orjson
+        json_dumps = orjson.dumps
+        json_loads = orjson.loads
+    except ImportError:
+        def json_dumps(obj):
+            return json.dumps(obj).encode("utf-8")
+        json_loads = json.loads
 
     try:
         # Get credentials from environment
@@ -105,7 +130,9 @@ def create_greengale_blog_post(
             visibility = visibility.value
         visibility = str(visibility) if visibility else "public"
 
-        # Validate inputs
+        # Validate inputs. GreenGalePostArgs declares the same limits so the agent
+        # sees them in the tool schema, but this function is called directly with
+        # the agent's arguments, so they are still enforced here.
         if len(title) > 1000:
             raise Exception(f"Title exceeds maximum length of 1,000 characters (got {len(title)})")
         if len(content) > 100000:
@@ -113,25 +140,191 @@ def create_greengale_blog_post(
         if visibility not in ("public", "url", "author"):
             raise Exception(f"Invalid visibility '{visibility}'. Must be 'public', 'url', or 'author'")
 
-        # Create session
-        session_url = f"{pds_host}/xrpc/com.atproto.server.createSession"
-        session_data = {
-            "identifier": username,
-            "password": password
-        }
-
-        session_response = requests.post(session_url, json=session_data, timeout=10)
-        session_response.raise_for_status()
-        session = session_response.json()
-        access_token = session.get("accessJwt")
-        user_did = session.get("did")
+        # --- Shared Bluesky session helpers ---
+        # This block is kept byte-identical in every Bluesky tool (see
+        # test_tool_shared_blocks.py). Each tool is uploaded as a single function,
+        # so the helpers cannot live in a shared module.
+
+        class _Retry(Retry):
+            # Rate limits (429) are rejected before anything is applied, so they
+            # are retried for any method. Other retryable statuses are limited to
+            # GET: a createRecord POST that got a 5xx may still have been written,
+            # and repeating it would create a duplicate.
+            def is_retry(self, method, status_code, has_retry_after=False):
+                if status_code != 429 and method.upper() != "GET":
+                    return False
+                return super().is_retry(method, status_code, has_retry_after)
+
+        # One pooled HTTP session so auth and every XRPC call in the tool share a
+        # keep-alive connection. Failed connections are retried for any method
+        # since nothing reached the server; read errors are not retried because
+        # the request may already have been applied.
+        http = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=32,
+            max_retries=_Retry(
+                total=3,
+                connect=3,
+                read=0,
+                backoff_factor=0.25,
+                status_forcelist=(429, 502, 503, 504),
+                allowed_methods=("GET", "POST"),
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+        )
+        http.mount("https://", adapter)
+        http.mount("http://", adapter)
+
+        def _private_cache_dir():
+            # Per-user cache directory inside the shared temp dir. It is only used
+            # if it is a real directory owned by this user and closed to everyone
+            # else, so another local user cannot plant or read cached tokens.
+            if not hasattr(os, "getuid"):
+                return None
+            uid = os.getuid()
+            path = os.path.join(tempfile.gettempdir(), f"umbra_bsky_cache_{uid}")
+            try:
+                os.mkdir(path, 0o700)
+            except FileExistsError:
+                pass
+            except OSError:
+                return None
+            try:
+                st = os.lstat(path)
+            except OSError:
+                return None
+            if not stat.S_ISDIR(st.st_mode) or st.st_uid != uid or st.st_mode & 0o077:
+                return None
+            return path
+
+        def _read_private_json(path):
+            # Returns None unless the file is a regular file owned by this user,
+            # readable by nobody else, and holds a JSON object
+            try:
+                fd = os.open(path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+            except OSError:
+                return None
+            try:
+                with os.fdopen(fd, "rb") as f:
+                    st = os.fstat(f.fileno())
+                    if not stat.S_ISREG(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+                        return None
+                    data = json.loads(f.read())
+            except (OSError, ValueError):
+                return None
+            return data if isinstance(data, dict) else None
+
+        def _write_private_json(path, data):
+            # mkstemp creates the temporary file with O_EXCL and mode 0600 under a
+            # random name, so it cannot be pre-created or symlinked by someone else
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, path)
+            except BaseException:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                raise
+
+        # Sessions are cached on disk between tool calls (each call may run in a
+        # fresh sandbox process), mirroring the session files used by bsky_utils.
+        # The cache file is shared by all the Bluesky tools.
+        cache_dir = _private_cache_dir()
+        session_key = hashlib.sha1(f"{pds_host}|{username}".encode("utf-8")).hexdigest()[:16]
+        session_cache_path = os.path.join(cache_dir, f"session_{session_key}.json") if cache_dir else None
+
+        def _jwt_expiry(token):
+            # Read the exp claim from the JWT payload without verifying it
+            try:
+                payload = token.split(".")[1]
+                payload += "=" * (-len(payload) % 4)
+                return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+            except Exception:
+                return 0.0
+
+        def _store_session(session):
+            if not session.get("accessJwt") or not session.get("did"):
+                raise Exception("Failed to get access token or DID from session")
+            cached = {
+                "accessJwt": session["accessJwt"],
+                "refreshJwt": session.get("refreshJwt"),
+                "did": session["did"],
+                "handle": session.get("handle", username),
+                "exp": _jwt_expiry(session["accessJwt"]),
+            }
+            if session_cache_path:
+                try:
+                    _write_private_json(session_cache_path, cached)
+                except OSError:
+                    pass  # Caching is best-effort
+            return cached
+
+        def _create_session():
+            session_url = f"{pds_host}/xrpc/com.atproto.server.createSession"
+            session_data = {
+                "identifier": username,
+                "password": password
+            }
+            try:
+                session_response = http.post(session_url, json=session_data, timeout=10)
+                session_response.raise_for_status()
+                return _store_session(session_response.json())
+            except Exception as e:
+                raise Exception(f"Authentication failed. ({str(e)})")
+
+        def _refresh_session(refresh_token):
+            # Returns None so the caller can fall back to a full login
+            if not refresh_token:
+                return None
+            try:
+                refresh_response = http.post(
+                    f"{pds_host}/xrpc/com.atproto.server.refreshSession",
+                    headers={"Authorization": f"Bearer {refresh_token}"},
+                    timeout=10
+                )
+                refresh_response.raise_for_status()
+                return _store_session(refresh_response.json())
+            except Exception:
+                return None
+
+        def _get_session(expired=False):
+            # Use the cached session while its access token is valid, otherwise
+            # refresh it, falling back to a full login
+            cached = (_read_private_json(session_cache_path) if session_cache_path else None) or {}
+            if not expired and cached.get("did") and time.time() < cached.get("exp", 0) - 60:
+                return cached
+            return _refresh_session(cached.get("refreshJwt")) or _create_session()
+
+        def _xrpc(method, nsid, headers=None, **kwargs):
+            # Authenticated XRPC request using the cached session. If the cached
+            # token was revoked or expired early, refresh it (or log in again) and
+            # retry once; the server rejected the request, so nothing was applied.
+            nonlocal session
+            url = f"{pds_host}/xrpc/{nsid}"
+            response = http.request(
+                method, url, headers={"Authorization": f"Bearer {session['accessJwt']}", **(headers or {})}, timeout=10, **kwargs
+            )
+            if response.status_code == 401 or (response.status_code == 400 and "ExpiredToken" in response.text):
+                session = _get_session(expired=True)
+                response = http.request(
+                    method, url, headers={"Authorization": f"Bearer {session['accessJwt']}", **(headers or {})}, timeout=10, **kwargs
+                )
+            response.raise_for_status()
+            return response
+
+        # --- End of shared Bluesky session helpers ---
+
+        session = _get_session()
+        user_did = session["did"]
         handle = session.get("handle", username)
 
-        if not access_token or not user_did:
-            raise Exception("Failed to get access token or DID from session")
-
         # Create blog post record
-        now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
 
         blog_record = {
             "$type": "app.greengale.blog.entry",
@@ -148,46 +341,38 @@ def create_greengale_blog_post(
         # Add theme if provided - handle both Pydantic models and dicts
         theme_description = "github-light (default)"
         if theme:
-            # Convert Pydantic model to dict if needed
-            if hasattr(theme, 'model_dump'):
-                theme_dict = theme.model_dump(exclude_none=True)
+            # Accept a preset name, a Pydantic model or a plain dict
+            if isinstance(theme, str):
+                theme_dict = {"preset": theme}
+            elif hasattr(theme, 'model_dump'):
+                theme_dict = theme.model_dump()
             elif hasattr(theme, 'dict'):
-                theme_dict = theme.dict(exclude_none=True)
+                theme_dict = theme.dict()
             elif isinstance(theme, dict):
-                theme_dict = {k: v for k, v in theme.items() if v is not None}
+                theme_dict = theme
             else:
                 theme_dict = {}
 
-            # Handle case where theme might be a string (preset name directly)
-            if isinstance(theme, str):
-                theme_dict = {"preset": theme}
-
             # Extract preset value if it's an enum
             preset_val = theme_dict.get("preset")
-            if preset_val and hasattr(preset_val, 'value'):
-                preset_val = preset_val.value
+            preset_val = getattr(preset_val, 'value', preset_val)
+
+            # Custom colors may already be nested under "custom" or given at top level
+            custom = theme_dict.get("custom") or theme_dict
+            background, text, accent = custom.get("background"), custom.get("text"), custom.get("accent")
 
             if preset_val:
                 blog_record["theme"] = {"preset": preset_val}
                 theme_description = preset_val
-            elif theme_dict.get("custom"):
-                # Already has custom nested structure
-                custom = theme_dict["custom"]
-                if custom.get("background") and custom.get("text") and custom.get("accent"):
-                    blog_record["theme"] = {"custom": custom}
-                    theme_description = f"custom (bg: {custom['background']}, text: {custom['text']}, accent: {custom['accent']})"
-                else:
-                    blog_record["theme"] = {"preset": "github-light"}
-            elif theme_dict.get("background") and theme_dict.get("text") and theme_dict.get("accent"):
-                # Custom colors at top level - nest under "custom" key
+            elif background and text and accent:
                 blog_record["theme"] = {
                     "custom": {
-                        "background": theme_dict["background"],
-                        "text": theme_dict["text"],
-                        "accent": theme_dict["accent"]
+                        "background": background,
+                        "text": text,
+                        "accent": accent
                     }
                 }
-                theme_description = f"custom (bg: {theme_dict['background']}, text: {theme_dict['text']}, accent: {theme_dict['accent']})"
+                theme_description = f"custom (bg: {background}, text: {text}, accent: {accent})"
             else:
                 # Default to github-light if theme is incomplete
                 blog_record["theme"] = {"preset": "github-light"}
@@ -200,18 +385,18 @@ def create_greengale_blog_post(
             blog_record["latex"] = True
 
         # Create the record
-        headers = {"Authorization": f"Bearer {access_token}"}
-        create_record_url = f"{pds_host}/xrpc/com.atproto.repo.createRecord"
-
         create_data = {
             "repo": user_did,
             "collection": "app.greengale.blog.entry",
             "record": blog_record
         }
 
-        post_response = requests.post(create_record_url, headers=headers, json=create_data, timeout=10)
-        post_response.raise_for_status()
-        result = post_response.json()
+        # Encode the record once; the body is reused if the request is retried
+        create_body = json_dumps(create_data)
+        post_response = _xrpc(
+            "POST", "com.atproto.repo.createRecord", headers={"Content-Type": "application/json"}, data=create_body
+        )
+        result = json_loads(post_response.content)
 
         # Extract the record key from the URI
         post_uri = result.get("uri")
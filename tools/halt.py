@@ -1,8 +1,10 @@
 """Halt tool for terminating bsky.py activity."""
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class HaltArgs(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     reason: str = Field(
         default="User requested halt",
         description="Optional reason for halting activity"
@@ -4,12 +4,14 @@ Bluesky Like Tool
 This tool allows umbra to like posts on Bluesky using their AT Protocol URI and CID.
 """
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 
 
 class LikeBlueskyPostArgs(BaseModel):
     """Arguments for liking a Bluesky post"""
 
+    model_config = ConfigDict(defer_build=True)
+
     uri: str = Field(
         ...,
         description="The AT Protocol URI of the post to like (e.g., at://did:plc:.../app.bsky.feed.post/...)"
@@ -48,8 +50,16 @@ def like_bluesky_post(uri: str, cid: str) -> str:
         Exception: If the API request fails
     """
     import os
+    import json
+    import time
+    import base64
+    import hashlib
+    import stat
+    import tempfile
     import requests
     from datetime import datetime, timezone
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
 
     # Validate inputs
     if not uri.startswith("at://"):
@@ -70,18 +80,188 @@ def like_bluesky_post(uri: str, cid: str) -> str:
     pds_host = pds_host.rstrip("/")
 
     try:
-        # Step 1: Authenticate and get session
-        session_url = f"{pds_host}/xrpc/com.atproto.server.createSession"
-        session_response = requests.post(
-            session_url,
-            json={"identifier": username, "password": password},
-            timeout=10
+        # --- Shared Bluesky session helpers ---
+        # This block is kept byte-identical in every Bluesky tool (see
+        # test_tool_shared_blocks.py). Each tool is uploaded as a single function,
+        # so the helpers cannot live in a shared module.
+
+        class _Retry(Retry):
+            # Rate limits (429) are rejected before anything is applied, so they
+            # are retried for any method. Other retryable statuses are limited to
+            # GET: a createRecord POST that got a 5xx may still have been written,
+            # and repeating it would create a duplicate.
+            def is_retry(self, method, status_code, has_retry_after=False):
+                if status_code != 429 and method.upper() != "GET":
+                    return False
+                return super().is_retry(method, status_code, has_retry_after)
+
+        # One pooled HTTP session so auth and every XRPC call in the tool share a
+        # keep-alive connection. Failed connections are retried for any method
+        # since nothing reached the server; read errors are not retried because
+        # the request may already have been applied.
+        http = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=32,
+            max_retries=_Retry(
+                total=3,
+                connect=3,
+                read=0,
+                backoff_factor=0.25,
+                status_forcelist=(429, 502, 503, 504),
+                allowed_methods=("GET", "POST"),
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
         )
-        session_response.raise_for_status()
+        http.mount("https://", adapter)
+        http.mount("http://", adapter)
 
-        session_data = session_response.json()
-        access_token = session_data["accessJwt"]
-        user_did = session_data["did"]
+        def _private_cache_dir():
+            # Per-user cache directory inside the shared temp dir. It is only used
+            # if it is a real directory owned by this user and closed to everyone
+            # else, so another local user cannot plant or read cached tokens.
+            if not hasattr(os, "getuid"):
+                return None
+            uid = os.getuid()
+            path = os.path.join(tempfile.gettempdir(), f"umbra_bsky_cache_{uid}")
+            try:
+                os.mkdir(path, 0o700)
+            except FileExistsError:
+                pass
+            except OSError:
+                return None
+            try:
+                st = os.lstat(path)
+            except OSError:
+                return None
+            if not stat.S_ISDIR(st.st_mode) or st.st_uid != uid or st.st_mode & 0o077:
+                return None
+            return path
+
+        def _read_private_json(path):
+            # Returns None unless the file is a regular file owned by this user,
+            # readable by nobody else, and holds a JSON object
+            try:
+                fd = os.open(path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+            except OSError:
+                return None
+            try:
+                with os.fdopen(fd, "rb") as f:
+                    st = os.fstat(f.fileno())
+                    if not stat.S_ISREG(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+                        return None
+                    data = json.loads(f.read())
+            except (OSError, ValueError):
+                return None
+            return data if isinstance(data, dict) else None
+
+        def _write_private_json(path, data):
+            # mkstemp creates the temporary file with O_EXCL and mode 0600 under a
+            # random name, so it cannot be pre-created or symlinked by someone else
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, path)
+            except BaseException:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                raise
+
+        # Sessions are cached on disk between tool calls (each call may run in a
+        # fresh sandbox process), mirroring the session files used by bsky_utils.
+        # The cache file is shared by all the Bluesky tools.
+        cache_dir = _private_cache_dir()
+        session_key = hashlib.sha1(f"{pds_host}|{username}".encode("utf-8")).hexdigest()[:16]
+        session_cache_path = os.path.join(cache_dir, f"session_{session_key}.json") if cache_dir else None
+
+        def _jwt_expiry(token):
+            # Read the exp claim from the JWT payload without verifying it
+            try:
+                payload = token.split(".")[1]
+                payload += "=" * (-len(payload) % 4)
+                return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+            except Exception:
+                return 0.0
+
+        def _store_session(session):
+            if not session.get("accessJwt") or not session.get("did"):
+                raise Exception("Failed to get access token or DID from session")
+            cached = {
+                "accessJwt": session["accessJwt"],
+                "refreshJwt": session.get("refreshJwt"),
+                "did": session["did"],
+                "handle": session.get("handle", username),
+                "exp": _jwt_expiry(session["accessJwt"]),
+            }
+            if session_cache_path:
+                try:
+                    _write_private_json(session_cache_path, cached)
+                except OSError:
+                    pass  # Caching is best-effort
+            return cached
+
+        def _create_session():
+            session_url = f"{pds_host}/xrpc/com.atproto.server.createSession"
+            session_data = {
+                "identifier": username,
+                "password": password
+            }
+            try:
+                session_response = http.post(session_url, json=session_data, timeout=10)
+                session_response.raise_for_status()
+                return _store_session(session_response.json())
+            except Exception as e:
+                raise Exception(f"Authentication failed. ({str(e)})")
+
+        def _refresh_session(refresh_token):
+            # Returns None so the caller can fall back to a full login
+            if not refresh_token:
+                return None
+            try:
+                refresh_response = http.post(
+                    f"{pds_host}/xrpc/com.atproto.server.refreshSession",
+                    headers={"Authorization": f"Bearer {refresh_token}"},
+                    timeout=10
+                )
+                refresh_response.raise_for_status()
+                return _store_session(refresh_response.json())
+            except Exception:
+                return None
+
+        def _get_session(expired=False):
+            # Use the cached session while its access token is valid, otherwise
+            # refresh it, falling back to a full login
+            cached = (_read_private_json(session_cache_path) if session_cache_path else None) or {}
+            if not expired and cached.get("did") and time.time() < cached.get("exp", 0) - 60:
+                return cached
+            return _refresh_session(cached.get("refreshJwt")) or _create_session()
+
+        def _xrpc(method, nsid, headers=None, **kwargs):
+            # Authenticated XRPC request using the cached session. If the cached
+            # token was revoked or expired early, refresh it (or log in again) and
+            # retry once; the server rejected the request, so nothing was applied.
+            nonlocal session
+            url = f"{pds_host}/xrpc/{nsid}"
+            response = http.request(
+                method, url, headers={"Authorization": f"Bearer {session['accessJwt']}", **(headers or {})}, timeout=10, **kwargs
+            )
+            if response.status_code == 401 or (response.status_code == 400 and "ExpiredToken" in response.text):
+                session = _get_session(expired=True)
+                response = http.request(
+                    method, url, headers={"Authorization": f"Bearer {session['accessJwt']}", **(headers or {})}, timeout=10, **kwargs
+                )
+            response.raise_for_status()
+            return response
+
+        # --- End of shared Bluesky session helpers ---
+
+        # Step 1: Authenticate and get session
+        session = _get_session()
+        user_did = session["did"]
 
         # Step 2: Create the like record
         like_record = {
@@ -90,25 +270,17 @@ def like_bluesky_post(uri: str, cid: str) -> str:
                 "uri": uri,
                 "cid": cid
             },
-            "createdAt": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+            "createdAt": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
         }
 
         # Step 3: Submit the like via createRecord API
-        create_url = f"{pds_host}/xrpc/com.atproto.repo.createRecord"
-        headers = {"Authorization": f"Bearer {access_token}"}
         create_data = {
             "repo": user_did,
             "collection": "app.bsky.feed.like",
             "record": like_record
         }
 
-        create_response = requests.post(
-            create_url,
-            headers=headers,
-            json=create_data,
-            timeout=10
-        )
-        create_response.raise_for_status()
+        _xrpc("POST", "com.atproto.repo.createRecord", json=create_data)
 
         # Return success message
         return f"Successfully liked post: {uri}"
@@ -1,9 +1,11 @@
 """Post tool for creating Bluesky posts."""
 from typing import List, Optional
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, validator
 
 
 class PostArgs(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     text: List[str] = Field(
         ..., 
         description="List of texts to create posts (each max 300 characters). Single item creates one post, multiple items create a thread."
@@ -39,8 +41,29 @@ def create_new_bluesky_post(text: List[str], lang: str = "en-US") -> str:
         Exception: If the post fails or list is empty
     """
     import os
+    import re
+    import json
+    import time
+    import base64
+    import hashlib
+    import stat
+    import tempfile
     import requests
     from datetime import datetime, timezone
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    from concurrent.futures import ThreadPoolExecutor
+
+    # orjson encodes the records and parses the responses several times faster
+    # than the stdlib; fall back to json if the sandbox doesn't have it
+    try:
+        import orjson
+        json_dumps = orjson.dumps
+        json_loads = orjson.loads
+    except ImportError:
+        def json_dumps(obj):
+            return json.dumps(obj).encode("utf-8")
+        json_loads = json.loads
     
     try:
         # Validate input
@@ -60,33 +83,320 @@ def create_new_bluesky_post(text: List[str], lang: str = "en-US") -> str:
         if not username or not password:
             raise Exception("BSKY_USERNAME and BSKY_PASSWORD environment variables must be set")
         
-        # Create session
-        session_url = f"{pds_host}/xrpc/com.atproto.server.createSession"
-        session_data = {
-            "identifier": username,
-            "password": password
-        }
-        
-        session_response = requests.post(session_url, json=session_data, timeout=10)
-        session_response.raise_for_status()
-        session = session_response.json()
-        access_token = session.get("accessJwt")
-        user_did = session.get("did")
-        
-        if not access_token or not user_did:
-            raise Exception("Failed to get access token or DID from session")
+        # --- Shared Bluesky session helpers ---
+        # This block is kept byte-identical in every Bluesky tool (see
+        # test_tool_shared_blocks.py). Each tool is uploaded as a single function,
+        # so the helpers cannot live in a shared module.
+
+        class _Retry(Retry):
+            # Rate limits (429) are rejected before anything is applied, so they
+            # are retried for any method. Other retryable statuses are limited to
+            # GET: a createRecord POST that got a 5xx may still have been written,
+            # and repeating it would create a duplicate.
+            def is_retry(self, method, status_code, has_retry_after=False):
+                if status_code != 429 and method.upper() != "GET":
+                    return False
+                return super().is_retry(method, status_code, has_retry_after)
+
+        # One pooled HTTP session so auth and every XRPC call in the tool share a
+        # keep-alive connection. Failed connections are retried for any method
+        # since nothing reached the server; read errors are not retried because
+        # the request may already have been applied.
+        http = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=32,
+            max_retries=_Retry(
+                total=3,
+                connect=3,
+                read=0,
+                backoff_factor=0.25,
+                status_forcelist=(429, 502, 503, 504),
+                allowed_methods=("GET", "POST"),
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
+        )
+        http.mount("https://", adapter)
+        http.mount("http://", adapter)
+
+        def _private_cache_dir():
+            # Per-user cache directory inside the shared temp dir. It is only used
+            # if it is a real directory owned by this user and closed to everyone
+            # else, so another local user cannot plant or read cached tokens.
+            if not hasattr(os, "getuid"):
+                return None
+            uid = os.getuid()
+            path = os.path.join(tempfile.gettempdir(), f"umbra_bsky_cache_{uid}")
+            try:
+                os.mkdir(path, 0o700)
+            except FileExistsError:
+                pass
+            except OSError:
+                return None
+            try:
+                st = os.lstat(path)
+            except OSError:
+                return None
+            if not stat.S_ISDIR(st.st_mode) or st.st_uid != uid or st.st_mode & 0o077:
+                return None
+            return path
+
+        def _read_private_json(path):
+            # Returns None unless the file is a regular file owned by this user,
+            # readable by nobody else, and holds a JSON object
+            try:
+                fd = os.open(path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+            except OSError:
+                return None
+            try:
+                with os.fdopen(fd, "rb") as f:
+                    st = os.fstat(f.fileno())
+                    if not stat.S_ISREG(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+                        return None
+                    data = json.loads(f.read())
+            except (OSError, ValueError):
+                return None
+            return data if isinstance(data, dict) else None
+
+        def _write_private_json(path, data):
+            # mkstemp creates the temporary file with O_EXCL and mode 0600 under a
+            # random name, so it cannot be pre-created or symlinked by someone else
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, path)
+            except BaseException:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                raise
+
+        # Sessions are cached on disk between tool calls (each call may run in a
+        # fresh sandbox process), mirroring the session files used by bsky_utils.
+        # The cache file is shared by all the Bluesky tools.
+        cache_dir = _private_cache_dir()
+        session_key = hashlib.sha1(f"{pds_host}|{username}".encode("utf-8")).hexdigest()[:16]
+        session_cache_path = os.path.join(cache_dir, f"session_{session_key}.json") if cache_dir else None
+
+        def _jwt_expiry(token):
+            # Read the exp claim from the JWT payload without verifying it
+            try:
+                payload = token.split(".")[1]
+                payload += "=" * (-len(payload) % 4)
+                return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+            except Exception:
+                return 0.0
+
+        def _store_session(session):
+            if not session.get("accessJwt") or not session.get("did"):
+                raise Exception("Failed to get access token or DID from session")
+            cached = {
+                "accessJwt": session["accessJwt"],
+                "refreshJwt": session.get("refreshJwt"),
+                "did": session["did"],
+                "handle": session.get("handle", username),
+                "exp": _jwt_expiry(session["accessJwt"]),
+            }
+            if session_cache_path:
+                try:
+                    _write_private_json(session_cache_path, cached)
+                except OSError:
+                    pass  # Caching is best-effort
+            return cached
+
+        def _create_session():
+            session_url = f"{pds_host}/xrpc/com.atproto.server.createSession"
+            session_data = {
+                "identifier": username,
+                "password": password
+            }
+            try:
+                session_response = http.post(session_url, json=session_data, timeout=10)
+                session_response.raise_for_status()
+                return _store_session(session_response.json())
+            except Exception as e:
+                raise Exception(f"Authentication failed. ({str(e)})")
+
+        def _refresh_session(refresh_token):
+            # Returns None so the caller can fall back to a full login
+            if not refresh_token:
+                return None
+            try:
+                refresh_response = http.post(
+                    f"{pds_host}/xrpc/com.atproto.server.refreshSession",
+                    headers={"Authorization": f"Bearer {refresh_token}"},
+                    timeout=10
+                )
+                refresh_response.raise_for_status()
+                return _store_session(refresh_response.json())
+            except Exception:
+                return None
+
+        def _get_session(expired=False):
+            # Use the cached session while its access token is valid, otherwise
+            # refresh it, falling back to a full login
+            cached = (_read_private_json(session_cache_path) if session_cache_path else None) or {}
+            if not expired and cached.get("did") and time.time() < cached.get("exp", 0) - 60:
+                return cached
+            return _refresh_session(cached.get("refreshJwt")) or _create_session()
+
+        def _xrpc(method, nsid, headers=None, **kwargs):
+            # Authenticated XRPC request using the cached session. If the cached
+            # token was revoked or expired early, refresh it (or log in again) and
+            # retry once; the server rejected the request, so nothing was applied.
+            nonlocal session
+            url = f"{pds_host}/xrpc/{nsid}"
+            response = http.request(
+                method, url, headers={"Authorization": f"Bearer {session['accessJwt']}", **(headers or {})}, timeout=10, **kwargs
+            )
+            if response.status_code == 401 or (response.status_code == 400 and "ExpiredToken" in response.text):
+                session = _get_session(expired=True)
+                response = http.request(
+                    method, url, headers={"Authorization": f"Bearer {session['accessJwt']}", **(headers or {})}, timeout=10, **kwargs
+                )
+            response.raise_for_status()
+            return response
+
+        # --- End of shared Bluesky session helpers ---
+
+        session = _get_session()
+        user_did = session["did"]
         
         # Create posts (single or thread)
-        import re
-        headers = {"Authorization": f"Bearer {access_token}"}
-        create_record_url = f"{pds_host}/xrpc/com.atproto.repo.createRecord"
+        # Compile the facet pattern once for every post in the thread. Mentions and
+        # URLs are matched by one alternation so each post is scanned once, and a
+        # mention inside a URL's path is not also reported as an overlapping facet.
+        # The pattern matches str with ASCII-only \W and \b, which behave as they
+        # would on the UTF-8 bytes; byte offsets come from a per-post table.
+        facet_pattern = re.compile(
+            r"(?:^|\W)(?:"
+            r"(?P<mention>@(?:[a-zA-Z0-9](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z](?:[a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?)"
+            r"|(?P<url>https?:\/\/(?:www\.)?[-a-zA-Z0-9@:%._\+~#=]{1,256}\.[a-zA-Z0-9()]{1,6}\b(?:[-a-zA-Z0-9()@:%_\+.~#?&//=]*[-a-zA-Z0-9@%_\+~#//=])?)"
+            r")",
+            re.ASCII
+        )
+
+        def _byte_offsets(post_text):
+            # Map character offsets to UTF-8 byte offsets in one pass
+            if post_text.isascii():
+                # One byte per character
+                return range(len(post_text) + 1)
+            # Each character starts at a byte that is not a UTF-8 continuation
+            # byte (0b10xxxxxx)
+            text_bytes = post_text.encode("UTF-8")
+            byte_offsets = [j for j, byte in enumerate(text_bytes) if byte & 0xC0 != 0x80]
+            byte_offsets.append(len(text_bytes))
+            return byte_offsets
         
+        # --- Shared Bluesky handle resolution helpers ---
+        # This block is kept byte-identical in post.py and reply.py (see
+        # test_tool_shared_blocks.py).
+
+        def _resolve_handle(handle):
+            # Returns None on failure so the mention is left as plain text
+            try:
+                resolve_response = http.get(
+                    f"{pds_host}/xrpc/com.atproto.identity.resolveHandle",
+                    params={"handle": handle},
+                    timeout=5
+                )
+                if resolve_response.status_code == 200:
+                    did = resolve_response.json().get("did")
+                    if isinstance(did, str) and did.startswith("did:"):
+                        return did
+            except Exception:
+                pass
+            return None
+
+        # Resolved DIDs are cached on disk between tool calls, next to the session
+        # cache in the private cache directory. A handle can move to another
+        # account, so entries expire after an hour.
+        did_cache_path = os.path.join(cache_dir, "did_cache.json") if cache_dir else None
+        did_cache_ttl = 3600.0
+        did_cache_max_entries = 4096
+
+        def _load_did_cache():
+            # Keep only well-formed [did, resolved_at] entries
+            did_cache = {}
+            stored = (_read_private_json(did_cache_path) if did_cache_path else None) or {}
+            for handle, entry in stored.items():
+                if (
+                    isinstance(entry, list)
+                    and len(entry) == 2
+                    and isinstance(entry[0], str)
+                    and entry[0].startswith("did:")
+                    and isinstance(entry[1], (int, float))
+                ):
+                    did_cache[handle] = entry
+            return did_cache
+
+        def _resolve_handles(handles):
+            # Map each handle to its DID, or None if it could not be resolved.
+            # Cache misses are resolved concurrently, so N mentions cost about
+            # one round trip of wall time instead of N.
+            if not handles:
+                return {}
+            did_cache = _load_did_cache()
+            now_ts = time.time()
+            dids = {}
+            for handle in handles:
+                entry = did_cache.get(handle)
+                if entry and now_ts - entry[1] < did_cache_ttl:
+                    dids[handle] = entry[0]
+
+            pending_handles = [handle for handle in handles if handle not in dids]
+            if pending_handles:
+                with ThreadPoolExecutor(max_workers=min(8, len(pending_handles))) as executor:
+                    resolved_dids = list(executor.map(_resolve_handle, pending_handles))
+                for handle, did in zip(pending_handles, resolved_dids):
+                    dids[handle] = did
+                    if did:
+                        did_cache[handle] = [did, now_ts]
+                if did_cache_path and any(resolved_dids):
+                    # Keep the most recently resolved entries within the bound
+                    if len(did_cache) > did_cache_max_entries:
+                        newest = sorted(did_cache.items(), key=lambda item: item[1][1])[-did_cache_max_entries:]
+                        did_cache = dict(newest)
+                    try:
+                        _write_private_json(did_cache_path, did_cache)
+                    except OSError:
+                        pass  # Caching is best-effort
+            return dids
+
+        # --- End of shared Bluesky handle resolution helpers ---
+
+        # Parse mentions and URLs - fixed to handle both at start of text. The
+        # mentions of every post in the thread are resolved concurrently up front,
+        # so N mentions cost at most one round trip of wall time instead of N
+        post_spans = []
+        for post_text in text:
+            spans = []
+            if "@" in post_text or "://" in post_text:  # Skip the regex for plain posts
+                matches = list(facet_pattern.finditer(post_text))
+                if matches:
+                    byte_offsets = _byte_offsets(post_text)
+                    # Use the group's positions to skip the optional prefix
+                    spans = [
+                        (m.lastgroup, byte_offsets[m.start(m.lastgroup)], byte_offsets[m.end(m.lastgroup)], m.group(m.lastgroup))
+                        for m in matches
+                    ]
+            post_spans.append(spans)
+        # Resolve each distinct handle once (without the @); handles are case-insensitive
+        handles = list(dict.fromkeys(
+            value[1:].lower() for spans in post_spans for kind, _, _, value in spans if kind == "mention"
+        ))
+
+        mention_dids = _resolve_handles(handles)
+
         post_urls = []
         previous_post = None
         root_post = None
         
         for i, post_text in enumerate(text):
-            now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+            now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
             
             post_record = {
                 "$type": "app.bsky.feed.post",
@@ -102,50 +412,22 @@ def create_new_bluesky_post(text: List[str], lang: str = "en-US") -> str:
                     "parent": previous_post
                 }
             
-            # Add facets for mentions and URLs
+            # Add facets for mentions and URLs, parsed and resolved above
             facets = []
-            
-            # Parse mentions - fixed to handle @ at start of text
-            mention_regex = rb"(?:^|[$|\W])(@([a-zA-Z0-9]([a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?\.)+[a-zA-Z]([a-zA-Z0-9-]{0,61}[a-zA-Z0-9])?)"
-            text_bytes = post_text.encode("UTF-8")
-            
-            for m in re.finditer(mention_regex, text_bytes):
-                handle = m.group(1)[1:].decode("UTF-8")  # Remove @ prefix
-                # Adjust byte positions to account for the optional prefix
-                mention_start = m.start(1)
-                mention_end = m.end(1)
-                try:
-                    resolve_resp = requests.get(
-                        f"{pds_host}/xrpc/com.atproto.identity.resolveHandle",
-                        params={"handle": handle},
-                        timeout=5
-                    )
-                    if resolve_resp.status_code == 200:
-                        did = resolve_resp.json()["did"]
-                        facets.append({
-                            "index": {
-                                "byteStart": mention_start,
-                                "byteEnd": mention_end,
-                            },
-                            "features": [{"$type": "app.bsky.richtext.facet#mention", "did": did}],
-                        })
-                except:
-                    continue
-            
-            # Parse URLs - fixed to handle URLs at start of text
-            url_regex = rb"(?:^|[$|\W])(https?:\/\/(www\.)?[-a-zA-Z0-9@:%._\+~#=]{1,256}\.[a-zA-Z0-9()]{1,6}\b([-a-zA-Z0-9()@:%_\+.~#?&//=]*[-a-zA-Z0-9@%_\+~#//=])?)"
-            
-            for m in re.finditer(url_regex, text_bytes):
-                url = m.group(1).decode("UTF-8")
-                # Adjust byte positions to account for the optional prefix
-                url_start = m.start(1)
-                url_end = m.end(1)
+            for kind, byte_start, byte_end, value in post_spans[i]:
+                if kind == "mention":
+                    did = mention_dids.get(value[1:].lower())
+                    if not did:
+                        continue
+                    feature = {"$type": "app.bsky.richtext.facet#mention", "did": did}
+                else:
+                    feature = {"$type": "app.bsky.richtext.facet#link", "uri": value}
                 facets.append({
                     "index": {
-                        "byteStart": url_start,
-                        "byteEnd": url_end,
+                        "byteStart": byte_start,
+                        "byteEnd": byte_end,
                     },
-                    "features": [{"$type": "app.bsky.richtext.facet#link", "uri": url}],
+                    "features": [feature],
                 })
             
             if facets:
@@ -158,9 +440,9 @@ def create_new_bluesky_post(text: List[str], lang: str = "en-US") -> str:
                 "record": post_record
             }
             
-            post_response = requests.post(create_record_url, headers=headers, json=create_data, timeout=10)
-            post_response.raise_for_status()
-            result = post_response.json()
+            result = json_loads(_xrpc(
+                "POST", "com.atproto.repo.createRecord", headers={"Content-Type": "application/json"}, data=json_dumps(create_data)
+            ).content)
             
             post_uri = result.get("uri")
             post_cid = result.get("cid")
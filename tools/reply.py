@@ -31,6 +31,18 @@ class ReplyToBlueskyPostArgs(BaseModel):
         default="en-US",
         description="Language code for the reply (e.g., 'en-US', 'es', 'ja', 'th'). Defaults to 'en-US'"
     )
+    root_uri: Optional[str] = Field(
+        default=None,
+        description="Optional AT Protocol URI of the thread's root post, if already known. Pass together with root_cid to skip looking up the thread root."
+    )
+    root_cid: Optional[str] = Field(
+        default=None,
+        description="Optional Content ID (CID) of the thread's root post, if already known. Pass together with root_uri."
+    )
+    is_root: bool = Field(
+        default=False,
+        description="Set to true if the post being replied to is not itself a reply (it starts its own thread), to skip looking up the thread root."
+    )
 
     @field_validator("uri")
     @classmethod
@@ -52,7 +64,15 @@ class ReplyToBlueskyPostArgs(BaseModel):
         return v
 
 
-def reply_to_bluesky_post(uri: str, cid: str, text: List[str], lang: str = "en-US") -> str:
+def reply_to_bluesky_post(
+    uri: str,
+    cid: str,
+    text: List[str],
+    lang: str = "en-US",
+    root_uri: Optional[str] = None,
+    root_cid: Optional[str] = None,
+    is_root: bool = False
+) -> str:
     """
     Reply to a post on Bluesky with one or more posts.
 
@@ -69,6 +89,11 @@ def reply_to_bluesky_post(uri: str, cid: str, text: List[str], lang: str = "en-U
         text: List of reply texts (each max 300 characters). Single item creates one reply,
               multiple items create a threaded reply chain.
         lang: Language code for the reply (e.g., 'en-US', 'es', 'ja', 'th'). Defaults to 'en-US'
+        root_uri: Optional URI of the thread's root post. Together with root_cid, this
+                  skips looking up the post being replied to.
+        root_cid: Optional CID of the thread's root post
+        is_root: Set to True if the post being replied to is not itself a reply, which
+                 also skips the lookup
 
     Returns:
         Success message with the reply URI(s)
@@ -78,9 +103,30 @@ def reply_to_bluesky_post(uri: str, cid: str, text: List[str], lang: str = "en-U
         Exception: If the API request fails
     """
     import os
+    import json
+    import time
+    import base64
+    import hashlib
+    import stat
+    import tempfile
     import requests
-    from datetime import datetime, timezone
+    from datetime import datetime, timedelta, timezone
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    from concurrent.futures import ThreadPoolExecutor
     import re
+    import random
+
+    # orjson encodes the records and parses the responses several times faster
+    # than the stdlib; fall back to json if the sandbox doesn't have it
+    try:
+        import orjson
+        json_dumps = orjson.dumps
+        json_loads = orjson.loads
+    except ImportError:
+        def json_dumps(obj):
+            return json.dumps(obj).encode("utf-8")
+        json_loads = json.loads
 
     # Validate inputs
     if not uri.startswith("at://"):
@@ -109,120 +155,401 @@ def reply_to_bluesky_post(uri: str, cid: str, text: List[str], lang: str = "en-U
     pds_host = pds_host.rstrip("/")
 
     try:
-        # Step 1: Authenticate and get session
-        session_url = f"{pds_host}/xrpc/com.atproto.server.createSession"
-        session_response = requests.post(
-            session_url,
-            json={"identifier": username, "password": password},
-            timeout=10
-        )
-        session_response.raise_for_status()
-
-        session_data = session_response.json()
-        access_token = session_data["accessJwt"]
-        user_did = session_data["did"]
-
-        # Step 2: Fetch the post to determine thread structure
-        headers = {"Authorization": f"Bearer {access_token}"}
-
-        # Get the post we're replying to to check if it's part of a thread
-        get_posts_url = f"{pds_host}/xrpc/app.bsky.feed.getPosts"
-        get_posts_response = requests.get(
-            get_posts_url,
-            headers=headers,
-            params={"uris": uri},
-            timeout=10
+        # --- Shared Bluesky session helpers ---
+        # This block is kept byte-identical in every Bluesky tool (see
+        # test_tool_shared_blocks.py). Each tool is uploaded as a single function,
+        # so the helpers cannot live in a shared module.
+
+        class _Retry(Retry):
+            # Rate limits (429) are rejected before anything is applied, so they
+            # are retried for any method. Other retryable statuses are limited to
+            # GET: a createRecord POST that got a 5xx may still have been written,
+            # and repeating it would create a duplicate.
+            def is_retry(self, method, status_code, has_retry_after=False):
+                if status_code != 429 and method.upper() != "GET":
+                    return False
+                return super().is_retry(method, status_code, has_retry_after)
+
+        # One pooled HTTP session so auth and every XRPC call in the tool share a
+        # keep-alive connection. Failed connections are retried for any method
+        # since nothing reached the server; read errors are not retried because
+        # the request may already have been applied.
+        http = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=32,
+            max_retries=_Retry(
+                total=3,
+                connect=3,
+                read=0,
+                backoff_factor=0.25,
+                status_forcelist=(429, 502, 503, 504),
+                allowed_methods=("GET", "POST"),
+                respect_retry_after_header=True,
+                raise_on_status=False
+            )
         )
-        get_posts_response.raise_for_status()
+        http.mount("https://", adapter)
+        http.mount("http://", adapter)
+
+        def _private_cache_dir():
+            # Per-user cache directory inside the shared temp dir. It is only used
+            # if it is a real directory owned by this user and closed to everyone
+            # else, so another local user cannot plant or read cached tokens.
+            if not hasattr(os, "getuid"):
+                return None
+            uid = os.getuid()
+            path = os.path.join(tempfile.gettempdir(), f"umbra_bsky_cache_{uid}")
+            try:
+                os.mkdir(path, 0o700)
+            except FileExistsError:
+                pass
+            except OSError:
+                return None
+            try:
+                st = os.lstat(path)
+            except OSError:
+                return None
+            if not stat.S_ISDIR(st.st_mode) or st.st_uid != uid or st.st_mode & 0o077:
+                return None
+            return path
+
+        def _read_private_json(path):
+            # Returns None unless the file is a regular file owned by this user,
+            # readable by nobody else, and holds a JSON object
+            try:
+                fd = os.open(path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+            except OSError:
+                return None
+            try:
+                with os.fdopen(fd, "rb") as f:
+                    st = os.fstat(f.fileno())
+                    if not stat.S_ISREG(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+                        return None
+                    data = json.loads(f.read())
+            except (OSError, ValueError):
+                return None
+            return data if isinstance(data, dict) else None
+
+        def _write_private_json(path, data):
+            # mkstemp creates the temporary file with O_EXCL and mode 0600 under a
+            # random name, so it cannot be pre-created or symlinked by someone else
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, path)
+            except BaseException:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                raise
 
-        posts_data = get_posts_response.json()
-        posts = posts_data.get("posts", [])
+        # Sessions are cached on disk between tool calls (each call may run in a
+        # fresh sandbox process), mirroring the session files used by bsky_utils.
+        # The cache file is shared by all the Bluesky tools.
+        cache_dir = _private_cache_dir()
+        session_key = hashlib.sha1(f"{pds_host}|{username}".encode("utf-8")).hexdigest()[:16]
+        session_cache_path = os.path.join(cache_dir, f"session_{session_key}.json") if cache_dir else None
 
-        # Determine root for the thread
-        root_uri = uri
-        root_cid = cid
+        def _jwt_expiry(token):
+            # Read the exp claim from the JWT payload without verifying it
+            try:
+                payload = token.split(".")[1]
+                payload += "=" * (-len(payload) % 4)
+                return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+            except Exception:
+                return 0.0
+
+        def _store_session(session):
+            if not session.get("accessJwt") or not session.get("did"):
+                raise Exception("Failed to get access token or DID from session")
+            cached = {
+                "accessJwt": session["accessJwt"],
+                "refreshJwt": session.get("refreshJwt"),
+                "did": session["did"],
+                "handle": session.get("handle", username),
+                "exp": _jwt_expiry(session["accessJwt"]),
+            }
+            if session_cache_path:
+                try:
+                    _write_private_json(session_cache_path, cached)
+                except OSError:
+                    pass  # Caching is best-effort
+            return cached
+
+        def _create_session():
+            session_url = f"{pds_host}/xrpc/com.atproto.server.createSession"
+            session_data = {
+                "identifier": username,
+                "password": password
+            }
+            try:
+                session_response = http.post(session_url, json=session_data, timeout=10)
+                session_response.raise_for_status()
+                return _store_session(session_response.json())
+            except Exception as e:
+                raise Exception(f"Authentication failed. ({str(e)})")
+
+        def _refresh_session(refresh_token):
+            # Returns None so the caller can fall back to a full login
+            if not refresh_token:
+                return None
+            try:
+                refresh_response = http.post(
+                    f"{pds_host}/xrpc/com.atproto.server.refreshSession",
+                    headers={"Authorization": f"Bearer {refresh_token}"},
+                    timeout=10
+                )
+                refresh_response.raise_for_status()
+                return _store_session(refresh_response.json())
+            except Exception:
+                return None
+
+        def _get_session(expired=False):
+            # Use the cached session while its access token is valid, otherwise
+            # refresh it, falling back to a full login
+            cached = (_read_private_json(session_cache_path) if session_cache_path else None) or {}
+            if not expired and cached.get("did") and time.time() < cached.get("exp", 0) - 60:
+                return cached
+            return _refresh_session(cached.get("refreshJwt")) or _create_session()
+
+        def _xrpc(method, nsid, headers=None, **kwargs):
+            # Authenticated XRPC request using the cached session. If the cached
+            # token was revoked or expired early, refresh it (or log in again) and
+            # retry once; the server rejected the request, so nothing was applied.
+            nonlocal session
+            url = f"{pds_host}/xrpc/{nsid}"
+            response = http.request(
+                method, url, headers={"Authorization": f"Bearer {session['accessJwt']}", **(headers or {})}, timeout=10, **kwargs
+            )
+            if response.status_code == 401 or (response.status_code == 400 and "ExpiredToken" in response.text):
+                session = _get_session(expired=True)
+                response = http.request(
+                    method, url, headers={"Authorization": f"Bearer {session['accessJwt']}", **(headers or {})}, timeout=10, **kwargs
+                )
+            response.raise_for_status()
+            return response
 
-        if posts:
-            post = posts[0]
-            record = post.get("record", {})
-            reply_info = record.get("reply")
+        # --- End of shared Bluesky session helpers ---
 
-            # If the post we're replying to is itself a reply, use its root
-            if reply_info and isinstance(reply_info, dict):
-                root_ref = reply_info.get("root")
-                if root_ref and isinstance(root_ref, dict):
-                    root_uri = root_ref.get("uri", uri)
-                    root_cid = root_ref.get("cid", cid)
+        # Step 1: Authenticate and get session
+        session = _get_session()
+        user_did = session["did"]
+
+        # Step 2: Determine the root for the thread and resolve mentioned handles.
+        # The root lookup is skipped when the caller already knows the root, or
+        # that the target post is one.
+        lookup_root = not (root_uri and root_cid) and not is_root
+        if not (root_uri and root_cid):
+            root_uri = uri
+            root_cid = cid
+
+        def _lookup_root():
+            # Fetch the post we're replying to to check if it's part of a thread
+            posts_data = json_loads(_xrpc("GET", "app.bsky.feed.getPosts", params={"uris": uri}).content)
+            posts = posts_data.get("posts", [])
+
+            if posts:
+                post = posts[0]
+                record = post.get("record", {})
+                reply_info = record.get("reply")
+
+                # If the post we're replying to is itself a reply, use its root
+                if reply_info and isinstance(reply_info, dict):
+                    root_ref = reply_info.get("root")
+                    if root_ref and isinstance(root_ref, dict):
+                        return root_ref.get("uri", uri), root_ref.get("cid", cid)
+            return uri, cid
 
-        # Step 3: Create replies (single or threaded chain)
-        create_url = f"{pds_host}/xrpc/com.atproto.repo.createRecord"
         mention_pattern = re.compile(r'@([a-zA-Z0-9.-]+)')
         url_pattern = re.compile(
             r'https?://[^\s<>"{}|\\^`\[\]]+[^\s<>"{}|\\^`\[\].,;:!?]'
         )
 
-        reply_uris = []
-        # For first reply: parent is the target post
-        # For subsequent replies: parent is our previous reply
-        parent_uri = uri
-        parent_cid = cid
+        # --- Shared Bluesky handle resolution helpers ---
+        # This block is kept byte-identical in post.py and reply.py (see
+        # test_tool_shared_blocks.py).
 
-        for i, reply_text in enumerate(text):
-            now = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+        def _resolve_handle(handle):
+            # Returns None on failure so the mention is left as plain text
+            try:
+                resolve_response = http.get(
+                    f"{pds_host}/xrpc/com.atproto.identity.resolveHandle",
+                    params={"handle": handle},
+                    timeout=5
+                )
+                if resolve_response.status_code == 200:
+                    did = resolve_response.json().get("did")
+                    if isinstance(did, str) and did.startswith("did:"):
+                        return did
+            except Exception:
+                pass
+            return None
+
+        # Resolved DIDs are cached on disk between tool calls, next to the session
+        # cache in the private cache directory. A handle can move to another
+        # account, so entries expire after an hour.
+        did_cache_path = os.path.join(cache_dir, "did_cache.json") if cache_dir else None
+        did_cache_ttl = 3600.0
+        did_cache_max_entries = 4096
+
+        def _load_did_cache():
+            # Keep only well-formed [did, resolved_at] entries
+            did_cache = {}
+            stored = (_read_private_json(did_cache_path) if did_cache_path else None) or {}
+            for handle, entry in stored.items():
+                if (
+                    isinstance(entry, list)
+                    and len(entry) == 2
+                    and isinstance(entry[0], str)
+                    and entry[0].startswith("did:")
+                    and isinstance(entry[1], (int, float))
+                ):
+                    did_cache[handle] = entry
+            return did_cache
+
+        def _resolve_handles(handles):
+            # Map each handle to its DID, or None if it could not be resolved.
+            # Cache misses are resolved concurrently, so N mentions cost about
+            # one round trip of wall time instead of N.
+            if not handles:
+                return {}
+            did_cache = _load_did_cache()
+            now_ts = time.time()
+            dids = {}
+            for handle in handles:
+                entry = did_cache.get(handle)
+                if entry and now_ts - entry[1] < did_cache_ttl:
+                    dids[handle] = entry[0]
+
+            pending_handles = [handle for handle in handles if handle not in dids]
+            if pending_handles:
+                with ThreadPoolExecutor(max_workers=min(8, len(pending_handles))) as executor:
+                    resolved_dids = list(executor.map(_resolve_handle, pending_handles))
+                for handle, did in zip(pending_handles, resolved_dids):
+                    dids[handle] = did
+                    if did:
+                        did_cache[handle] = [did, now_ts]
+                if did_cache_path and any(resolved_dids):
+                    # Keep the most recently resolved entries within the bound
+                    if len(did_cache) > did_cache_max_entries:
+                        newest = sorted(did_cache.items(), key=lambda item: item[1][1])[-did_cache_max_entries:]
+                        did_cache = dict(newest)
+                    try:
+                        _write_private_json(did_cache_path, did_cache)
+                    except OSError:
+                        pass  # Caching is best-effort
+            return dids
+
+        # --- End of shared Bluesky handle resolution helpers ---
+
+        # Find the mentions in every reply part up front so each distinct handle
+        # is resolved once, even when it is repeated within or across parts.
+        # Handles are case-insensitive.
+        part_mentions = [
+            [(match.group(1).lower(), match.start(), match.end()) for match in mention_pattern.finditer(reply_text)]
+            if "@" in reply_text else []  # Skip the regex for parts without mentions
+            for reply_text in text
+        ]
+        handles = list(dict.fromkeys(handle for mentions in part_mentions for handle, _, _ in mentions))
+
+        # The handle lookups and the root lookup are independent and run
+        # concurrently, so they cost about one round trip of wall time in total
+        if lookup_root and handles:
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                root_future = executor.submit(_lookup_root)
+                mention_dids = _resolve_handles(handles)
+                root_uri, root_cid = root_future.result()
+        else:
+            mention_dids = _resolve_handles(handles)
+            if lookup_root:
+                root_uri, root_cid = _lookup_root()
 
-            # Process text for rich text features (mentions, links)
-            facets = []
+        # Step 3: Create replies (single or threaded chain)
+        # A threaded reply chain is created with a single applyWrites request. Each
+        # part has to reference its parent's CID, so record keys (TIDs) and CIDs are
+        # computed locally; the PDS derives the same CID from the record's dag-cbor
+        # encoding. Without libipld, fall back to one createRecord per part.
+        use_batch = False
+        if len(text) > 1:
+            try:
+                import libipld
+                use_batch = True
+            except ImportError:
+                pass
 
-            # Detect mentions
-            for match in mention_pattern.finditer(reply_text):
-                handle = match.group(1)
-                start = match.start()
-                end = match.end()
+        tid_chars = "234567abcdefghijklmnopqrstuvwxyz"
+        tid_clock_id = random.getrandbits(10)
+        tid_micros = time.time_ns() // 1000
 
-                try:
-                    resolve_url = f"{pds_host}/xrpc/com.atproto.identity.resolveHandle"
-                    resolve_response = requests.get(
-                        resolve_url,
-                        params={"handle": handle},
-                        timeout=5
-                    )
+        def _tid(micros):
+            # 13 base32-sortable characters: microsecond timestamp, then clock id
+            value = (micros << 10) | tid_clock_id
+            return "".join(tid_chars[(value >> shift) & 31] for shift in range(60, -1, -5))
 
-                    if resolve_response.status_code == 200:
-                        did = resolve_response.json().get("did")
-                        if did:
-                            byte_start = len(reply_text[:start].encode('UTF-8'))
-                            byte_end = len(reply_text[:end].encode('UTF-8'))
-
-                            facets.append({
-                                "index": {
-                                    "byteStart": byte_start,
-                                    "byteEnd": byte_end
-                                },
-                                "features": [{
-                                    "$type": "app.bsky.richtext.facet#mention",
-                                    "did": did
-                                }]
-                            })
-                except:
-                    pass
+        def _record_cid(record):
+            # CIDv1, dag-cbor codec, sha2-256 multihash
+            digest = hashlib.sha256(libipld.encode_dag_cbor(record)).digest()
+            return libipld.encode_cid(b"\x01\x71\x12\x20" + digest)
 
-            # Detect URLs
-            for match in url_pattern.finditer(reply_text):
-                url = match.group(0)
-                start = match.start()
-                end = match.end()
+        # Every part of the chain shares the thread root and the request headers
+        root_ref = {"uri": root_uri, "cid": root_cid}
+        json_headers = {"Content-Type": "application/json"}
 
-                byte_start = len(reply_text[:start].encode('UTF-8'))
-                byte_end = len(reply_text[:end].encode('UTF-8'))
+        # Take the clock once for the chain; each part is stamped a millisecond
+        # after its parent so the replies still sort in order
+        created_at = datetime.now(timezone.utc)
 
+        def _build_record(i, parent_uri, parent_cid):
+            reply_text = text[i]
+            now = (created_at + timedelta(milliseconds=i)).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+            # Process text for rich text features (mentions, links)
+            facets = []
+
+            # Detect URLs; skip the regex for parts without any
+            url_matches = list(url_pattern.finditer(reply_text)) if "://" in reply_text else []
+
+            # Map character offsets to UTF-8 byte offsets in one pass, instead of
+            # re-encoding the text up to every facet boundary. Plain parts skip it.
+            if part_mentions[i] or url_matches:
+                if reply_text.isascii():
+                    # One byte per character
+                    byte_offsets = range(len(reply_text) + 1)
+                else:
+                    # Each character starts at a byte that is not a UTF-8
+                    # continuation byte (0b10xxxxxx)
+                    text_bytes = reply_text.encode('UTF-8')
+                    byte_offsets = [j for j, byte in enumerate(text_bytes) if byte & 0xC0 != 0x80]
+                    byte_offsets.append(len(text_bytes))
+
+            # Add mentions whose handles resolved above
+            for handle, start, end in part_mentions[i]:
+                did = mention_dids[handle]
+                if did:
+                    facets.append({
+                        "index": {
+                            "byteStart": byte_offsets[start],
+                            "byteEnd": byte_offsets[end]
+                        },
+                        "features": [{
+                            "$type": "app.bsky.richtext.facet#mention",
+                            "did": did
+                        }]
+                    })
+
+            # Add URLs
+            for match in url_matches:
                 facets.append({
                     "index": {
-                        "byteStart": byte_start,
-                        "byteEnd": byte_end
+                        "byteStart": byte_offsets[match.start()],
+                        "byteEnd": byte_offsets[match.end()]
                     },
                     "features": [{
                         "$type": "app.bsky.richtext.facet#link",
-                        "uri": url
+                        "uri": match.group(0)
                     }]
                 })
 
@@ -236,10 +563,7 @@ def reply_to_bluesky_post(uri: str, cid: str, text: List[str], lang: str = "en-U
                         "uri": parent_uri,
                         "cid": parent_cid
                     },
-                    "root": {
-                        "uri": root_uri,
-                        "cid": root_cid
-                    }
+                    "root": root_ref
                 }
             }
 
@@ -249,30 +573,82 @@ def reply_to_bluesky_post(uri: str, cid: str, text: List[str], lang: str = "en-U
             if facets:
                 reply_record["facets"] = facets
 
-            # Submit the reply
-            create_data = {
-                "repo": user_did,
-                "collection": "app.bsky.feed.post",
-                "record": reply_record
-            }
-
-            create_response = requests.post(
-                create_url,
-                headers=headers,
-                json=create_data,
-                timeout=10
-            )
-            create_response.raise_for_status()
-
-            response_data = create_response.json()
-            new_uri = response_data.get("uri", "")
-            new_cid = response_data.get("cid", "")
-
-            reply_uris.append(new_uri)
-
-            # Update parent for next reply in chain
-            parent_uri = new_uri
-            parent_cid = new_cid
+            return reply_record
+
+        def _create_sequentially():
+            # One createRecord per part. For the first reply the parent is the
+            # target post; each later reply's parent is the previous reply as
+            # reported by the server.
+            created = []
+            parent_uri = uri
+            parent_cid = cid
+            for i in range(len(text)):
+                create_data = {
+                    "repo": user_did,
+                    "collection": "app.bsky.feed.post",
+                    "record": _build_record(i, parent_uri, parent_cid)
+                }
+                response_data = json_loads(_xrpc(
+                    "POST", "com.atproto.repo.createRecord", headers=json_headers, data=json_dumps(create_data)
+                ).content)
+                parent_uri = response_data.get("uri", "")
+                parent_cid = response_data.get("cid", "")
+                created.append((parent_uri, parent_cid))
+            return created
+
+        def _create_batched():
+            # Write the whole chain in one applyWrites request, applied atomically.
+            # Returns the created (uri, cid) pairs as reported by the server, or
+            # None if they do not match the locally computed ones and the chain
+            # was rolled back.
+            writes = []
+            expected = []
+            parent_uri = uri
+            parent_cid = cid
+            for i in range(len(text)):
+                reply_record = _build_record(i, parent_uri, parent_cid)
+                rkey = _tid(tid_micros + i)
+                parent_uri = f"at://{user_did}/app.bsky.feed.post/{rkey}"
+                parent_cid = _record_cid(reply_record)
+                writes.append({
+                    "$type": "com.atproto.repo.applyWrites#create",
+                    "collection": "app.bsky.feed.post",
+                    "rkey": rkey,
+                    "value": reply_record
+                })
+                expected.append((parent_uri, parent_cid))
+
+            response_data = json_loads(_xrpc(
+                "POST", "com.atproto.repo.applyWrites", headers=json_headers,
+                data=json_dumps({"repo": user_did, "writes": writes})
+            ).content)
+            results = response_data.get("results") if isinstance(response_data, dict) else None
+            created = []
+            if isinstance(results, list):
+                created = [(result.get("uri"), result.get("cid")) for result in results if isinstance(result, dict)]
+            if created == expected:
+                return created
+
+            # The server did not confirm the URIs and CIDs the chain was built on,
+            # so later parts may point at parents that don't exist. Delete whatever
+            # was written before recreating the chain, and give up rather than
+            # risk posting it twice if that fails.
+            try:
+                for write in writes:
+                    _xrpc(
+                        "POST", "com.atproto.repo.deleteRecord", headers=json_headers,
+                        data=json_dumps({"repo": user_did, "collection": "app.bsky.feed.post", "rkey": write["rkey"]})
+                    )
+            except Exception as e:
+                raise Exception(
+                    f"applyWrites returned unexpected results and rolling back the reply chain failed ({e}); "
+                    "not retrying to avoid duplicate replies"
+                )
+            return None
+
+        created = (_create_batched() if use_batch else None) or _create_sequentially()
+        reply_uris = [created_uri for created_uri, _ in created]
+        parent_cid = created[-1][1]
 
         # Return appropriate message based on single reply or thread
         if len(text) == 1: